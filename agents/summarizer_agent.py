@@ -1,20 +1,30 @@
 # SummarizerAgent implementation placeholder
+import contextvars
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
 from langchain_community.llms import Ollama
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
+from tools.concurrency import map_concurrently
+from tools.metrics import LLMMetricsCallback
+
 class SummarizerAgent:
     """An agent that summarizes research paper abstracts."""
 
-    def __init__(self, model: str = "mistral"):
+    def __init__(self, model: str = "mistral", llm=None, cache=None):
         """
         Initializes the SummarizerAgent.
 
         Args:
             model (str): The name of the Ollama model to use (e.g., 'mistral', 'llama3').
+            llm: Optional pre-built LangChain LLM to use instead of creating an Ollama client.
+            cache (LLMCache): Optional cache consulted before invoking the LLM.
         """
         # FIX: Store the model name as an attribute
         self.model = model
+        self.cache = cache
         
         # Define the prompt template for summarization
         template = """
@@ -26,16 +36,18 @@ class SummarizerAgent:
 
         CONCISE SUMMARY:
         """
+        self.template = template
         prompt = PromptTemplate(
             template=template,
             input_variables=["abstract"]
         )
 
-        # Initialize the Ollama LLM
-        llm = Ollama(model=model)
+        # Initialize the Ollama LLM unless one was supplied
+        if llm is None:
+            llm = Ollama(model=model)
 
-        # Create the summarization chain by piping the components together
-        self.chain = prompt | llm | StrOutputParser()
+        # Create the summarization chain by piping the components together; each LLM call is timed as 'llm.summarize'
+        self.chain = (prompt | llm | StrOutputParser()).with_config(callbacks=[LLMMetricsCallback("summarize")])
 
     def summarize_paper(self, abstract: str) -> str:
         """
@@ -51,8 +63,119 @@ class SummarizerAgent:
             return "Error: Invalid abstract provided for summarization."
             
         try:
-            summary = self.chain.invoke({"abstract": abstract})
-            return summary
+            return self._summarize(abstract)
+        except Exception as e:
+            print(f"An error occurred during summarization: {e}")
+            return "Error: Could not generate summary."
+
+    def summarize_many(self, abstracts: list, max_concurrency: int = 4) -> list:
+        """
+        Generates summaries for several abstracts concurrently.
+
+        Requests are sent to the LLM in parallel (at most `max_concurrency` at a
+        time), so the total wall time is close to the slowest single call rather
+        than the sum of all calls. A failure on one abstract does not affect the others.
+
+        Args:
+            abstracts (list): A list of paper abstract strings.
+            max_concurrency (int): The maximum number of LLM calls in flight at once.
+
+        Returns:
+            list: The generated summaries, in the same order as `abstracts`.
+        """
+        summaries = [None] * len(abstracts)
+        pending = []
+        for i, abstract in enumerate(abstracts):
+            if not abstract or not isinstance(abstract, str):
+                summaries[i] = "Error: Invalid abstract provided for summarization."
+            else:
+                pending.append(i)
+
+        if not pending:
+            return summaries
+
+        results = map_concurrently(self._summarize, [abstracts[i] for i in pending], max_concurrency)
+        for i, result in zip(pending, results):
+            if isinstance(result, Exception):
+                print(f"An error occurred during summarization: {result}")
+                summaries[i] = "Error: Could not generate summary."
+            else:
+                summaries[i] = result
+        return summaries
+
+    def stream_summary(self, abstract: str):
+        """
+        Streams a summary for a paper abstract as the LLM produces it.
+
+        Args:
+            abstract (str): The abstract of the research paper.
+
+        Yields:
+            str: Successive chunks of the summary.
+        """
+        try:
+            yield from self._stream_chunks(abstract)
         except Exception as e:
             print(f"An error occurred during summarization: {e}")
-            return "Error: Could not generate summary."
\ No newline at end of file
+            yield "\nError: Could not generate summary."
+
+    def stream_many(self, abstracts: list, max_concurrency: int = 4):
+        """
+        Streams summaries for several abstracts concurrently.
+
+        Each abstract is streamed in a worker thread and progress is handed back to the
+        caller's thread, so UI updates can be made safely from the consuming loop.
+
+        Args:
+            abstracts (list): A list of paper abstract strings.
+            max_concurrency (int): The maximum number of LLM calls in flight at once.
+
+        Yields:
+            tuple: (index, text_so_far) pairs. The last pair for an index holds its complete summary.
+        """
+        events = queue.Queue()
+        finished = object()
+
+        def worker(i, abstract):
+            text = ""
+            try:
+                for chunk in self._stream_chunks(abstract):
+                    text += chunk
+                    events.put((i, text))
+            except Exception as e:
+                print(f"An error occurred during summarization: {e}")
+                events.put((i, "Error: Could not generate summary."))
+            finally:
+                events.put((i, finished))
+
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as pool:
+            for i, abstract in enumerate(abstracts):
+                # Run each worker in a copy of the caller's context so its LLM spans count towards the caller's run
+                pool.submit(contextvars.copy_context().run, worker, i, abstract)
+
+            remaining = len(abstracts)
+            while remaining:
+                i, text = events.get()
+                if text is finished:
+                    remaining -= 1
+                    continue
+                yield i, text
+
+    def _summarize(self, abstract: str) -> str:
+        """Returns the summary of a valid abstract, from the cache when possible. LLM errors propagate."""
+        invoke = lambda: self.chain.invoke({"abstract": abstract})
+        if self.cache is None:
+            return invoke()
+        return self.cache.get_or_compute(self.model, self.template, abstract, invoke)
+
+    def _stream_chunks(self, abstract: str):
+        """Yields summary chunks (or a cached summary in one piece) and stores the full text in the cache. LLM errors propagate."""
+        if not abstract or not isinstance(abstract, str):
+            yield "Error: Invalid abstract provided for summarization."
+            return
+
+        stream = lambda: self.chain.stream({"abstract": abstract})
+        if self.cache is None:
+            yield from stream()
+        else:
+            yield from self.cache.stream_or_compute(self.model, self.template, abstract, stream)
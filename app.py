@@ -1,9 +1,7 @@
+import time
+
 import streamlit as st
-import os
-from vector_store.vector_manager import VectorManager
-from agents.summarizer_agent import SummarizerAgent
-from tools.mindmap_generator import MindmapGenerator
-from tools.pdf_exporter import PDFExporter
+import resources
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -14,10 +12,12 @@ st.set_page_config(
 
 # --- App State Management ---
 if 'assistant_initialized' not in st.session_state:
-    st.session_state.vector_manager = VectorManager()
-    st.session_state.summarizer = SummarizerAgent(model="mistral")
-    st.session_state.mindmapper = MindmapGenerator(model="mistral")
-    st.session_state.exporter = PDFExporter(model="mistral")
+    # Briefs are generated by the shared background job manager on top of process-wide resources,
+    # so a session only needs to remember which job it is waiting for
+    resources.init_metrics()
+    st.session_state.job_manager = resources.get_job_manager()
+    st.session_state.llm_cache = resources.get_llm_cache()
+    st.session_state.job_id = None
     st.session_state.assistant_initialized = True
     st.session_state.messages = []
     st.session_state.results = {}
@@ -30,51 +30,59 @@ with st.sidebar:
     st.header("Controls")
     topic = st.text_input("Research Topic", placeholder="e.g., Quantum Computing in Finance")
     max_papers = st.slider("Number of Papers to Analyze", min_value=3, max_value=15, value=5)
-    year_filter = st.number_input("Year (Optional)", min_value=2000, max_value=2025, step=1, placeholder="e.g., 2023")
+    year_filter = st.number_input("Year (Optional)", min_value=2000, max_value=2025, value=None, step=1, placeholder="e.g., 2023")
     
     generate_button = st.button("Generate Research Brief", type="primary", use_container_width=True)
 
+    cache_stats = st.session_state.llm_cache.stats()
+    st.caption(f"LLM cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses ({cache_stats['entries']} entries)")
+
 # --- Main Logic ---
+STAGE_LABELS = {
+    'search': "searching and ranking papers",
+    'summaries': "summarizing top papers",
+    'relations': "extracting concepts",
+    'executive_summary': "writing the executive summary",
+    'mindmap_image': "drawing the mind map",
+    'report': "compiling the PDF report",
+}
+
 if generate_button and topic:
+    # Identical in-flight requests (from this or another session) share one job
+    st.session_state.job_id = st.session_state.job_manager.submit(topic, max_papers=max_papers, year=year_filter)
     st.session_state.results = {} # Clear previous results
-    
-    with st.spinner("Step 1/4: Searching and ranking papers..."):
-        num_added = st.session_state.vector_manager.search_and_process_papers(query=topic, max_results=max_papers*2, year=year_filter)
-        top_papers = st.session_state.vector_manager.rank_papers(query=topic, top_n=max_papers)
-        st.session_state.results['top_papers'] = top_papers
-        st.success(f"Found and ranked {len(top_papers)} relevant papers.")
-
-    if top_papers:
-        with st.spinner("Step 2/4: Summarizing top papers... (This may take a moment)"):
-            summaries = {}
-            for paper in top_papers:
-                title = paper.get('title')
-                abstract = paper.get('summary')
-                summary = st.session_state.summarizer.summarize_paper(abstract)
-                summaries[title] = summary
-            st.session_state.results['summaries'] = summaries
-            st.success("Summaries generated.")
-
-        with st.spinner("Step 3/4: Generating concept mind map..."):
-            abstracts = [p.get('summary', '') for p in top_papers]
-            relationships = st.session_state.mindmapper.generate_mindmap_data(abstracts)
-            mindmap_path = "research_mindmap.png"
-            st.session_state.mindmapper.create_mindmap_image(relationships, output_path=mindmap_path)
-            st.session_state.results['mindmap_path'] = mindmap_path
-            st.success("Mind map created.")
-
-        with st.spinner("Step 4/4: Compiling PDF report..."):
-            pdf_path = "Research_Brief.pdf"
-            executive_summary = st.session_state.exporter.generate_executive_summary(list(summaries.values()))
-            st.session_state.results['executive_summary'] = executive_summary
-            
-            # Use the existing export_to_pdf but we already have the exec summary
-            # We will refactor this slightly for better efficiency in a real app
-            # For now, let's just generate the PDF with what we have
-            st.session_state.exporter.export_to_pdf(topic, top_papers, summaries, mindmap_path, pdf_path)
-            st.session_state.results['pdf_path'] = pdf_path
-            st.success("PDF report compiled.")
-            
+
+job_id = st.session_state.job_id
+if job_id and not st.session_state.results:
+    # Poll the job; it keeps running in the worker pool even if this script run is interrupted
+    live = st.empty()
+    while True:
+        job = st.session_state.job_manager.get(job_id)
+        if job is None or job['status'] in ("done", "failed"):
+            break
+        with live.container():
+            running = [STAGE_LABELS.get(stage, stage) for stage in job['stages']]
+            st.progress(job['progress'], text=("Now " + ", ".join(running) + "...") if running else "Waiting for a free worker...")
+            partial = job['partial']
+            for title, text in zip(partial.get('titles', []), partial.get('summaries', [])):
+                if text:
+                    st.markdown(f"**{title}**")
+                    st.markdown(text)
+            if partial.get('executive_summary'):
+                st.subheader("Executive Summary")
+                st.markdown(partial['executive_summary'])
+        time.sleep(0.5)
+    live.empty()
+
+    if job is None:
+        st.session_state.job_id = None
+        st.warning("The previous research brief is no longer available. Please generate it again.")
+    elif job['status'] == "failed":
+        st.session_state.job_id = None
+        st.error(f"Could not generate the research brief: {job['error']}")
+    else:
+        st.session_state.results = job['results']
+
 # --- Display Results ---
 if st.session_state.results:
     st.divider()
@@ -85,25 +93,45 @@ if st.session_state.results:
     st.write(st.session_state.results.get('executive_summary', "Not available."))
 
     # PDF Download Button
-    pdf_path = st.session_state.results.get('pdf_path')
-    if pdf_path and os.path.exists(pdf_path):
-        with open(pdf_path, "rb") as file:
-            st.download_button(
-                label="Download Full PDF Report",
-                data=file,
-                file_name=f"{topic.replace(' ', '_')}_Brief.pdf",
-                mime="application/pdf",
-                use_container_width=True
-            )
+    pdf_bytes = st.session_state.results.get('pdf_bytes')
+    if pdf_bytes:
+        brief_topic = st.session_state.results.get('topic', 'Research')
+        st.download_button(
+            label="Download Full PDF Report",
+            data=pdf_bytes,
+            file_name=f"{brief_topic.replace(' ', '_')}_Brief.pdf",
+            mime="application/pdf",
+            use_container_width=True
+        )
     
     # Mind Map
     st.subheader("Concept Mind Map")
-    mindmap_path = st.session_state.results.get('mindmap_path')
-    if mindmap_path and os.path.exists(mindmap_path):
-        st.image(mindmap_path)
+    mindmap_image = st.session_state.results.get('mindmap_image')
+    if mindmap_image:
+        st.image(mindmap_image)
     else:
         st.warning("Mind map could not be generated.")
 
+    # Stage timeline of the run that produced this brief
+    timeline = st.session_state.results.get('timeline')
+    if timeline:
+        with st.expander("Pipeline timeline"):
+            st.dataframe(
+                [{'Stage': t['stage'], 'Start (s)': round(t['start'], 2), 'End (s)': round(t['end'], 2),
+                  'Duration (s)': round(t['end'] - t['start'], 2)} for t in timeline],
+                use_container_width=True
+            )
+
+    # Per-operation timings and LLM throughput of the run that produced this brief
+    performance = st.session_state.results.get('performance')
+    if performance:
+        with st.expander("Performance"):
+            st.dataframe(
+                [{'Operation': row['span'], 'Calls': row['calls'], 'Total (s)': row['total_s'], 'Max (s)': row['max_s'],
+                  'Errors': row['errors'], 'Tokens/s': row.get('tokens_per_s')} for row in performance],
+                use_container_width=True
+            )
+
     # Detailed Summaries
     st.subheader("Detailed Summaries")
     top_papers = st.session_state.results.get('top_papers', [])
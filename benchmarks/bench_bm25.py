@@ -0,0 +1,75 @@
+"""
+Benchmark for the BM25 lexical index.
+
+Builds an index over synthetic abstracts and reports build time, on-disk size
+and median query latency for three kinds of query:
+
+- rare: an acronym plus two vocabulary terms
+- common: the same plus a stop word and the most frequent vocabulary term,
+  which occurs in nearly every document
+- restricted: a common query limited to 200 candidate IDs, as hybrid ranking does
+
+Usage:
+    python -m benchmarks.bench_bm25 --sizes 10000 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from vector_store.bm25_index import BM25Index
+
+VOCABULARY = [f"term{i}" for i in range(20000)]
+ACRONYMS = ["LoRA", "RLHF", "GNN", "ViT", "BERT", "DDPM", "NeRF", "MoE", "RAG", "PPO"]
+
+def make_corpus(n: int, rng: random.Random) -> list:
+    """Builds `n` abstract-length documents with a Zipf-like vocabulary and sprinkled acronyms."""
+    weights = [1.0 / (rank + 1) for rank in range(len(VOCABULARY))]
+    corpus = []
+    for _ in range(n):
+        words = rng.choices(VOCABULARY, weights=weights, k=180)
+        words.append(rng.choice(ACRONYMS))
+        corpus.append(" ".join(words))
+    return corpus
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000], help="Corpus sizes to test.")
+    parser.add_argument("--batch", type=int, default=500, help="Documents per add_documents call, as during ingestion.")
+    parser.add_argument("--queries", type=int, default=50, help="Queries per measurement.")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'docs':>8} {'build (s)':>10} {'size (MB)':>10} {'rare p50 (ms)':>14} {'common p50 (ms)':>16} {'restricted p50 (ms)':>20}")
+    for size in args.sizes:
+        corpus = make_corpus(size, rng)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bm25.db")
+            index = BM25Index(path)
+
+            start = time.perf_counter()
+            for offset in range(0, size, args.batch):
+                chunk = corpus[offset:offset + args.batch]
+                index.add_documents([f"doc-{offset + i}" for i in range(len(chunk))], chunk)
+            build = time.perf_counter() - start
+
+            latencies = {"rare": [], "common": [], "restricted": []}
+            for _ in range(args.queries):
+                query = f"{rng.choice(ACRONYMS)} {rng.choice(VOCABULARY[:2000])} {rng.choice(VOCABULARY)}"
+                common_query = f"the {VOCABULARY[0]} {query}"
+                candidate_ids = [f"doc-{i}" for i in rng.sample(range(size), min(200, size))]
+                for kind, text, candidates in (("rare", query, None), ("common", common_query, None),
+                                               ("restricted", common_query, candidate_ids)):
+                    start = time.perf_counter()
+                    index.search(text, top_n=50, candidate_ids=candidates)
+                    latencies[kind].append((time.perf_counter() - start) * 1000)
+            # Recent writes may still be in the write-ahead log
+            size_mb = sum(os.path.getsize(f) for f in (path, path + "-wal") if os.path.exists(f)) / 1e6
+            medians = {kind: statistics.median(values) for kind, values in latencies.items()}
+            print(f"{size:>8} {build:>10.2f} {size_mb:>10.1f} {medians['rare']:>14.2f} "
+                  f"{medians['common']:>16.2f} {medians['restricted']:>20.2f}")
+
+if __name__ == "__main__":
+    main()
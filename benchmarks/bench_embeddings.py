@@ -0,0 +1,124 @@
+"""
+Micro-benchmark for VectorManager embeddings.
+
+Measures start-up time and memory, document encoding throughput and cold vs.
+repeated query latency, either for the current VectorManager (one loaded
+SentenceTransformer used for every embedding, with a query cache) or for the
+original set-up (an unused SentenceTransformer plus Chroma's default embedding
+function, which loads its own copy of the model). Each mode runs in a fresh
+process so memory figures are comparable.
+
+Usage:
+    python -m benchmarks.bench_embeddings --docs 2000
+    python -m benchmarks.bench_embeddings --mode baseline
+"""
+import argparse
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+def make_documents(n: int) -> list:
+    """Builds `n` synthetic abstract-length documents."""
+    words = "transformer attention quantum graph neural retrieval diffusion benchmark optimization sparse".split()
+    return [" ".join(words[(i + j) % len(words)] for j in range(150)) + f" doc{i}" for i in range(n)]
+
+def rss_mb() -> float:
+    """Returns the current resident set size in MB, falling back to the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+class OptimizedSetup:
+    """The current VectorManager: Chroma is handed precomputed embeddings from the shared model."""
+
+    def __init__(self, db_path: str):
+        from vector_store.vector_manager import VectorManager
+        self.manager = VectorManager(db_path=db_path)
+        self.manager.embedding_function.embed_query("warm-up")
+
+    def add(self, ids: list, documents: list):
+        embeddings = self.manager.embedding_function.encode(documents)
+        self.manager.collection.add(ids=ids, documents=documents, embeddings=embeddings)
+
+    def query(self, text: str):
+        self.manager.collection.query(query_embeddings=[self.manager.embedding_function.embed_query(text)], n_results=5)
+
+class BaselineSetup:
+    """The original VectorManager: a SentenceTransformer is loaded but Chroma embeds with its default function."""
+
+    def __init__(self, db_path: str):
+        import chromadb
+        from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+        from sentence_transformers import SentenceTransformer
+        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        # What the original collection used implicitly; it loads its own ONNX model on first use
+        default_embedding_function = DefaultEmbeddingFunction()
+        self.collection = chromadb.PersistentClient(path=db_path).get_or_create_collection(
+            name="research_papers",
+            embedding_function=default_embedding_function,
+            metadata={"hnsw:space": "cosine"}
+        )
+        default_embedding_function(["warm-up"])
+
+    def add(self, ids: list, documents: list):
+        self.collection.add(ids=ids, documents=documents)
+
+    def query(self, text: str):
+        self.collection.query(query_texts=[text], n_results=5)
+
+def run(mode: str, num_docs: int, num_queries: int):
+    before = rss_mb()
+    with tempfile.TemporaryDirectory() as db_path:
+        start = time.perf_counter()
+        setup = OptimizedSetup(db_path) if mode == "optimized" else BaselineSetup(db_path)
+        startup = time.perf_counter() - start
+        after = rss_mb()
+        print(f"[{mode}] start-up: {startup:.2f}s, RSS {before:.0f} MB -> {after:.0f} MB (+{after - before:.0f} MB)")
+
+        documents = make_documents(num_docs)
+        start = time.perf_counter()
+        for offset in range(0, num_docs, 500):
+            chunk = documents[offset:offset + 500]
+            setup.add([f"doc-{offset + i}" for i in range(len(chunk))], chunk)
+        elapsed = time.perf_counter() - start
+        print(f"[{mode}] embed + add {num_docs} docs: {elapsed:.2f}s ({num_docs / elapsed:.0f} docs/s)")
+
+        queries = [f"research topic number {i}" for i in range(num_queries)]
+        cold, repeated = [], []
+        for latencies in (cold, repeated):
+            for query in queries:
+                start = time.perf_counter()
+                setup.query(query)
+                latencies.append(time.perf_counter() - start)
+        print(f"[{mode}] query latency, first time: median {statistics.median(cold) * 1000:.2f}ms")
+        print(f"[{mode}] query latency, repeated:   median {statistics.median(repeated) * 1000:.2f}ms")
+        print(f"[{mode}] RSS after queries: {rss_mb():.0f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=1000, help="Number of documents to embed and store.")
+    parser.add_argument("--queries", type=int, default=50, help="Number of distinct queries.")
+    parser.add_argument("--mode", choices=["both", "optimized", "baseline"], default="both",
+                        help="'both' runs each mode in its own process.")
+    args = parser.parse_args()
+
+    if args.mode != "both":
+        run(args.mode, args.docs, args.queries)
+        return
+    for mode in ("baseline", "optimized"):
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_embeddings", "--mode", mode,
+             "--docs", str(args.docs), "--queries", str(args.queries)],
+            check=True
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark for mind-map rendering on synthetic concept graphs.
+
+Compares the budgeted MindmapRenderer against an unbounded configuration
+(no pruning, full spring layout, 300 DPI, which matches the original renderer)
+for graphs of increasing size.
+
+Usage:
+    python -m benchmarks.bench_mindmap_render --edges 50 500 5000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from tools.mindmap_renderer import MindmapRenderer
+
+def make_relationships(num_edges: int, rng: random.Random) -> list:
+    """Builds a scale-free-ish set of relationships with roughly num_edges / 2 concepts."""
+    num_concepts = max(10, num_edges // 2)
+    concepts = [f"Concept {i}" for i in range(num_concepts)]
+    relations = ["improves", "uses", "extends", "evaluates", "is a"]
+    weights = [1.0 / (i + 1) for i in range(num_concepts)]
+    relationships = []
+    for _ in range(num_edges):
+        source, target = rng.choices(concepts, weights=weights, k=2)
+        relationships.append((source, rng.choice(relations), target))
+    return relationships
+
+def measure(renderer: MindmapRenderer, relationships: list, fmt: str, layout: str):
+    """Returns (seconds, peak traced MB, output KB) for one render."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    image = renderer.render(relationships, fmt=fmt, layout=layout)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6, len(image or b"") / 1e3
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--edges", type=int, nargs="+", default=[50, 500, 5000], help="Graph sizes in edges.")
+    parser.add_argument("--skip-unbounded-above", type=int, default=500,
+                        help="Skip the unbounded renderer for graphs larger than this (it can take minutes).")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    configs = [
+        ("budgeted png", MindmapRenderer(), "png", "auto"),
+        ("budgeted svg", MindmapRenderer(), "svg", "auto"),
+        ("unbounded png", MindmapRenderer(max_edges=None, max_nodes=None, dpi=300), "png", "spring"),
+    ]
+    print(f"{'edges':>6} {'config':<14} {'time (s)':>9} {'peak (MB)':>10} {'output (KB)':>12}")
+    for num_edges in args.edges:
+        relationships = make_relationships(num_edges, rng)
+        for name, renderer, fmt, layout in configs:
+            if renderer.max_edges is None and num_edges > args.skip_unbounded_above:
+                print(f"{num_edges:>6} {name:<14} {'skipped':>9}")
+                continue
+            elapsed, peak, size = measure(renderer, relationships, fmt, layout)
+            print(f"{num_edges:>6} {name:<14} {elapsed:>9.2f} {peak:>10.1f} {size:>12.1f}")
+
+if __name__ == "__main__":
+    main()
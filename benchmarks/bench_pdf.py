@@ -0,0 +1,78 @@
+"""
+Benchmark for PDF report rendering on generated briefs of increasing size.
+
+Builds synthetic briefs (titles, author lists and summaries of varying length, plus a
+300 DPI mind map) and renders each with PDFExporter, reporting layout and save time,
+page count, output size and peak RSS. Sizes run in ascending order, so the RSS column
+shows how the process peak grows with the largest report rendered so far.
+
+Usage:
+    python -m benchmarks.bench_pdf --papers 5 50 200 1000
+"""
+import argparse
+import random
+import resource
+import time
+
+from benchmarks.bench_mindmap_render import make_relationships
+from benchmarks.fakes import WORDS, FakeLLM
+from tools.metrics import metrics
+from tools.mindmap_renderer import MindmapRenderer
+from tools.pdf_exporter import PDFExporter
+from tools.research_brief import ResearchBrief
+
+def make_brief(num_papers: int, rng: random.Random, mindmap_image: bytes) -> ResearchBrief:
+    """Builds a brief whose summaries range from a few lines to several pages."""
+    def words(low, high):
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+    papers = []
+    summaries = {}
+    for i in range(num_papers):
+        title = f"{i + 1}. {words(4, 25).title()}"
+        papers.append({
+            'title': title,
+            'authors': ", ".join(f"Author {rng.randint(1, 500)}" for _ in range(rng.randint(1, 30))),
+            'url': f"http://arxiv.org/pdf/{i:05d}"
+        })
+        # Mostly short summaries with an occasional very long one, separated into paragraphs
+        summaries[title] = "\n\n".join(words(40, 200) for _ in range(rng.choice([1, 1, 2, 3, 12])))
+    return ResearchBrief(
+        topic="Synthetic benchmark topic",
+        papers=papers,
+        summaries=summaries,
+        executive_summary="\n\n".join(words(80, 160) for _ in range(4)),
+        mindmap_image=mindmap_image
+    )
+
+def peak_rss_mb() -> float:
+    """Returns the peak resident set size of this process in MB (ru_maxrss is in KB on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--papers", type=int, nargs="+", default=[5, 50, 200, 1000], help="Brief sizes in papers.")
+    parser.add_argument("--repeats", type=int, default=3, help="Renders per size; the median time is reported.")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    mindmap_image = MindmapRenderer(dpi=300).render(make_relationships(60, rng))
+    exporter = PDFExporter(llm=FakeLLM())
+
+    print(f"mind map: {len(mindmap_image) / 1e3:.0f} KB source PNG")
+    print(f"{'papers':>7} {'layout (s)':>11} {'save (s)':>9} {'total (s)':>10} {'pages':>6} {'output (KB)':>12} {'peak RSS (MB)':>14}")
+    for num_papers in sorted(args.papers):
+        brief = make_brief(num_papers, rng, mindmap_image)
+        runs = []
+        for _ in range(args.repeats):
+            with metrics.collect_run() as spans:
+                start = time.perf_counter()
+                pdf = exporter.render_pdf(brief)
+                total = time.perf_counter() - start
+            timings = {record['span']: record for record in spans}
+            runs.append((total, timings['pdf_layout']['duration'], timings['pdf_save']['duration'], timings['pdf_layout']['pages'], len(pdf)))
+        total, layout, save, pages, size = sorted(runs)[len(runs) // 2]
+        print(f"{num_papers:>7} {layout:>11.2f} {save:>9.2f} {total:>10.2f} {pages:>6} {size / 1e3:>12.1f} {peak_rss_mb():>14.1f}")
+
+if __name__ == "__main__":
+    main()
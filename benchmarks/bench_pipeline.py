@@ -0,0 +1,148 @@
+"""
+End-to-end benchmark for the research brief pipeline, fully offline.
+
+Drives VectorManager, SummarizerAgent, MindmapGenerator and PDFExporter through
+the real job pipeline (pipeline.jobs) with a synthetic arXiv corpus and a fake
+LLM of configurable latency and token rate. Reports per-stage latency
+percentiles, throughput for N concurrent briefs, peak RSS, and Chroma ranking
+latency at several corpus sizes.
+
+Usage:
+    python -m benchmarks.bench_pipeline --briefs 8 --workers 4 --llm-latency 0.5 --tokens-per-second 40
+    python -m benchmarks.bench_pipeline --corpus-sizes 1000 10000 100000 --briefs 0
+"""
+import argparse
+import os
+import resource
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+
+import chromadb
+import numpy as np
+
+from agents.summarizer_agent import SummarizerAgent
+from benchmarks.bench_ranking import populate
+from benchmarks.fakes import FakeLLM, HashingEmbeddingModel, SyntheticArxivSource
+from pipeline.job_store import JobStore
+from pipeline.jobs import JobManager
+from tools.artifact_store import ArtifactStore
+from tools.llm_cache import LLMCache
+from tools.mindmap_generator import MindmapGenerator
+from tools.pdf_exporter import PDFExporter
+from vector_store.bm25_index import BM25Index
+from vector_store.embeddings import CachedSentenceTransformerEmbedding
+from vector_store.query_log import QueryLog
+from vector_store.vector_manager import VectorManager
+
+def percentile(values: list, q: float) -> float:
+    """Returns the q-th percentile (0-100) using nearest-rank on sorted values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+def peak_rss_mb() -> float:
+    """Returns the peak resident set size of this process in MB (ru_maxrss is in KB on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def make_embedding_function(real: bool):
+    if real:
+        from sentence_transformers import SentenceTransformer
+        return CachedSentenceTransformerEmbedding(SentenceTransformer('all-MiniLM-L6-v2'))
+    return CachedSentenceTransformerEmbedding(HashingEmbeddingModel())
+
+def run_briefs(args, workdir: str, embedding_function):
+    """Runs `args.briefs` briefs through the job pipeline and prints latency and throughput."""
+    db_path = os.path.join(workdir, "chroma_db")
+    client = chromadb.PersistentClient(path=db_path)
+    # Shared by every job's VectorManager, as in resources.create_vector_manager
+    lexical_index = BM25Index(os.path.join(db_path, "bm25_index.db"))
+    query_log = QueryLog(os.path.join(db_path, "query_log.db"))
+    llm = FakeLLM(latency=args.llm_latency, tokens_per_second=args.tokens_per_second, response_tokens=args.response_tokens)
+    cache = LLMCache(os.path.join(workdir, "llm_cache.db")) if args.cache else None
+    artifact_store = ArtifactStore(os.path.join(workdir, "artifacts"))
+    source = SyntheticArxivSource(page_latency=args.page_latency)
+
+    def components():
+        return {
+            'vector_manager': VectorManager(db_path=db_path, source=source, embedding_function=embedding_function, client=client,
+                                            lexical_index=lexical_index, query_log=query_log),
+            'summarizer': SummarizerAgent(llm=llm, cache=cache),
+            'mindmapper': MindmapGenerator(llm=llm, cache=cache),
+            'exporter': PDFExporter(llm=llm, cache=cache),
+            'artifact_store': artifact_store,
+        }
+
+    manager = JobManager(components, JobStore(os.path.join(workdir, "jobs.db")), max_workers=args.workers, resume=False)
+    start = time.perf_counter()
+    job_ids = [manager.submit(f"synthetic topic {i}", max_papers=args.papers) for i in range(args.briefs)]
+
+    totals = []
+    stage_durations = defaultdict(list)
+    pending = set(job_ids)
+    while pending:
+        for job_id in list(pending):
+            job = manager.get(job_id)
+            if job['status'] == "failed":
+                raise RuntimeError(f"Job {job_id} failed: {job['error']}")
+            if job['status'] == "done":
+                pending.discard(job_id)
+                for entry in job['timeline']:
+                    stage_durations[entry['stage']].append(entry['end'] - entry['start'])
+                totals.append(max(entry['end'] for entry in job['timeline']))
+        time.sleep(0.05)
+    wall = time.perf_counter() - start
+
+    print(f"\n== {args.briefs} briefs, {args.workers} workers, {args.papers} papers each, "
+          f"LLM latency {args.llm_latency}s @ {args.tokens_per_second} tok/s ==")
+    print(f"{'stage':<18} {'p50 (s)':>8} {'p95 (s)':>8} {'p99 (s)':>8}")
+    for stage, durations in list(stage_durations.items()) + [("end-to-end", totals)]:
+        print(f"{stage:<18} {percentile(durations, 50):>8.2f} {percentile(durations, 95):>8.2f} {percentile(durations, 99):>8.2f}")
+    print(f"throughput: {args.briefs / wall:.2f} briefs/s (wall {wall:.1f}s)")
+    if cache is not None:
+        print(f"LLM cache: {cache.stats()}")
+
+def run_corpus_queries(args, workdir: str, embedding_function):
+    """Measures ranking latency as the collection grows."""
+    manager = VectorManager(db_path=os.path.join(workdir, "corpus_db"), embedding_function=embedding_function,
+                            source=SyntheticArxivSource())
+    dim = embedding_function.model.get_sentence_embedding_dimension()
+    rng = np.random.default_rng(0)
+    query = "graph neural networks for molecules"
+    embedding_function.embed_query(query)
+
+    print(f"\n{'papers':>8} {'query p50 (ms)':>15} {'query p95 (ms)':>15}")
+    for size in sorted(args.corpus_sizes):
+        populate(manager, size, dim, rng)
+        latencies = []
+        for _ in range(args.queries):
+            start = time.perf_counter()
+            manager.rank_papers(query, top_n=10)
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(f"{size:>8} {statistics.median(latencies):>15.2f} {percentile(latencies, 95):>15.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--briefs", type=int, default=8, help="Number of briefs to generate (0 skips this part).")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent briefs (JobManager pool size).")
+    parser.add_argument("--papers", type=int, default=5, help="Papers per brief.")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Fake LLM time to first token, in seconds.")
+    parser.add_argument("--tokens-per-second", type=float, default=40.0, help="Fake LLM streaming rate.")
+    parser.add_argument("--response-tokens", type=int, default=80, help="Fake LLM response length.")
+    parser.add_argument("--page-latency", type=float, default=0.2, help="Simulated arXiv latency per page, in seconds.")
+    parser.add_argument("--cache", action="store_true", help="Enable the LLM output cache.")
+    parser.add_argument("--corpus-sizes", type=int, nargs="*", default=[1000, 10000], help="Collection sizes for query timing.")
+    parser.add_argument("--queries", type=int, default=20, help="Queries per corpus size.")
+    parser.add_argument("--real-embeddings", action="store_true", help="Use all-MiniLM-L6-v2 instead of hashed vectors.")
+    args = parser.parse_args()
+
+    embedding_function = make_embedding_function(args.real_embeddings)
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.briefs:
+            run_briefs(args, workdir, embedding_function)
+        if args.corpus_sizes:
+            run_corpus_queries(args, workdir, embedding_function)
+    print(f"\npeak RSS: {peak_rss_mb():.0f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Scaling benchmark for VectorManager.rank_papers.
+
+Fills a temporary collection with synthetic papers (random unit vectors, so no
+encoding cost) and compares full-collection ranking against ranking scoped by a
+metadata filter and by a candidate-ID set.
+
+Usage:
+    python -m benchmarks.bench_ranking --sizes 1000 10000 100000
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from vector_store.vector_manager import VectorManager
+
+def populate(manager: VectorManager, size: int, dim: int, rng: np.random.Generator):
+    """Upserts synthetic papers spread over 20 topics and 10 years."""
+    collection = manager.collection
+    existing = collection.count()
+    for offset in range(existing, size, manager.write_batch_size):
+        n = min(manager.write_batch_size, size - offset)
+        embeddings = rng.standard_normal((n, dim)).astype(np.float32)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        ids = [f"paper-{offset + i}" for i in range(n)]
+        collection.upsert(
+            ids=ids,
+            embeddings=embeddings,
+            documents=[f"abstract {i}" for i in ids],
+            metadatas=[{
+                'title': paper_id,
+                'year': 2015 + (offset + i) % 10,
+                'source_query': f"topic {(offset + i) % 20}",
+                'ingested_at': offset + i
+            } for i, paper_id in enumerate(ids)]
+        )
+
+def time_calls(fn, repeats: int) -> float:
+    """Returns the median latency of `fn` in milliseconds."""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Collection sizes to test.")
+    parser.add_argument("--candidates", type=int, default=40, help="Size of the candidate-ID set.")
+    parser.add_argument("--repeats", type=int, default=20, help="Queries per measurement.")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as db_path:
+        manager = VectorManager(db_path=db_path)
+        dim = manager.embedding_model.get_sentence_embedding_dimension()
+        query = "graph neural networks for molecules"
+        manager.embedding_function.embed_query(query)  # Warm the query cache so only Chroma is timed
+
+        print(f"{'papers':>8} {'full (ms)':>10} {'where (ms)':>11} {'ids (ms)':>9}")
+        for size in sorted(args.sizes):
+            populate(manager, size, dim, rng)
+            candidates = [f"paper-{i}" for i in rng.choice(size, size=min(args.candidates, size), replace=False)]
+
+            full = time_calls(lambda: manager.rank_papers(query, top_n=10), args.repeats)
+            scoped = time_calls(lambda: manager.rank_papers(query, top_n=10, where={'source_query': 'topic 3'}, year=2018), args.repeats)
+            by_ids = time_calls(lambda: manager.rank_papers(query, top_n=10, candidate_ids=candidates), args.repeats)
+            print(f"{size:>8} {full:>10.2f} {scoped:>11.2f} {by_ids:>9.2f}")
+
+if __name__ == "__main__":
+    main()
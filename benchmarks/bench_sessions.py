@@ -0,0 +1,67 @@
+"""
+Benchmark for per-session start-up cost.
+
+Simulates N Streamlit sessions being initialized, either the old way (each
+session loads its own embedding model, Chroma client and LLM clients) or
+through the shared resource registry, and reports start-up time per session
+and resident memory.
+
+Usage:
+    python -m benchmarks.bench_sessions --sessions 10 --mode shared
+    python -m benchmarks.bench_sessions --sessions 10 --mode isolated
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+import resources
+from agents.summarizer_agent import SummarizerAgent
+from tools.mindmap_generator import MindmapGenerator
+from tools.pdf_exporter import PDFExporter
+from vector_store.vector_manager import VectorManager
+
+def rss_mb() -> float:
+    """Returns the current resident set size of this process in MB (Linux)."""
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * 4096 / 1e6
+
+def init_isolated(db_path: str):
+    """Initializes a session with private copies of every resource."""
+    return (
+        VectorManager(db_path=db_path),
+        SummarizerAgent(model="mistral"),
+        MindmapGenerator(model="mistral"),
+        PDFExporter(model="mistral"),
+    )
+
+def init_shared(db_path: str):
+    """Initializes a session on top of the shared resource registry."""
+    return resources.create_vector_manager(db_path), resources.create_agents(model="mistral")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10, help="Number of simulated sessions.")
+    parser.add_argument("--mode", choices=["shared", "isolated"], default="shared")
+    args = parser.parse_args()
+
+    init = init_shared if args.mode == "shared" else init_isolated
+    sessions = []  # Keep sessions alive, as Streamlit does
+    durations = []
+    baseline = rss_mb()
+    with tempfile.TemporaryDirectory() as db_path:
+        for i in range(args.sessions):
+            start = time.perf_counter()
+            sessions.append(init(db_path))
+            durations.append(time.perf_counter() - start)
+            print(f"session {i + 1:>3}: {durations[-1]:6.2f}s  RSS {rss_mb():8.1f} MB")
+
+    print(f"\nmode={args.mode} sessions={args.sessions}")
+    print(f"first session:  {durations[0]:.2f}s")
+    if len(durations) > 1:
+        print(f"later sessions: median {statistics.median(durations[1:]):.3f}s")
+    print(f"RSS growth:     {rss_mb() - baseline:.1f} MB")
+
+if __name__ == "__main__":
+    main()
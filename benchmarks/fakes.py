@@ -0,0 +1,106 @@
+"""
+Offline stand-ins for arXiv, Ollama and the embedding model, so the pipeline can be
+benchmarked on a plain machine without network access or a running LLM server.
+"""
+import hashlib
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Iterator, List, Optional
+
+import numpy as np
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+
+WORDS = (
+    "model learning neural graph attention transformer quantum optimization data training "
+    "inference benchmark retrieval language vision robust sparse efficient scalable federated "
+    "diffusion reinforcement policy agent reasoning embedding contrastive generative causal"
+).split()
+
+class FakeLLM(LLM):
+    """A LangChain LLM that answers after a fixed delay and streams at a fixed token rate."""
+
+    latency: float = 0.5  # Seconds before the first token
+    tokens_per_second: float = 50.0
+    response_tokens: int = 80
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-benchmark"
+
+    def _response(self, prompt: str) -> List[str]:
+        """Builds a deterministic response; relationship prompts get parseable relationship lines."""
+        rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+        if "RELATIONSHIPS" in prompt:
+            lines = []
+            for _ in range(max(1, self.response_tokens // 8)):
+                a, b = rng.sample(WORDS, 2)
+                lines.append(f"({a.title()} {rng.choice(WORDS)}) -> [{rng.choice(['uses', 'improves', 'extends'])}] -> ({b.title()})\n")
+            return lines
+        return [rng.choice(WORDS) + " " for _ in range(self.response_tokens)]
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> Iterator[GenerationChunk]:
+        time.sleep(self.latency)
+        for token in self._response(prompt):
+            time.sleep(1.0 / self.tokens_per_second)
+            yield GenerationChunk(text=token)
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> str:
+        tokens = self._response(prompt)
+        time.sleep(self.latency + len(tokens) / self.tokens_per_second)
+        return "".join(tokens)
+
+class HashingEmbeddingModel:
+    """A SentenceTransformer stand-in producing deterministic random unit vectors, for large synthetic corpora."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def encode(self, texts, batch_size: int = 64, normalize_embeddings: bool = True, convert_to_numpy: bool = True, show_progress_bar: bool = False):
+        vectors = np.empty((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+            vectors[i] = np.random.default_rng(seed).standard_normal(self.dim)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+class SyntheticArxivSource:
+    """An arXiv source that generates plausible results on the fly, with simulated paging latency."""
+
+    def __init__(self, page_size: int = 100, page_latency: float = 0.0, seed: int = 0):
+        """
+        Initializes the SyntheticArxivSource.
+
+        Args:
+            page_size (int): The number of results per simulated API page.
+            page_latency (float): Seconds of simulated network delay per page.
+            seed (int): Seed for the generated corpus.
+        """
+        self.page_size = page_size
+        self.page_latency = page_latency
+        self.seed = seed
+
+    def make_result(self, query: str, i: int):
+        """Builds the i-th result for a query, with the attributes VectorManager reads from arxiv.Result."""
+        rng = random.Random(f"{self.seed}:{query}:{i}")
+        title = " ".join(rng.choice(WORDS) for _ in range(8)).title()
+        summary = f"{query}. " + " ".join(rng.choice(WORDS) for _ in range(180))
+        paper_id = hashlib.sha1(f"{query}:{i}".encode("utf-8")).hexdigest()[:10]
+        return SimpleNamespace(
+            entry_id=f"http://arxiv.org/abs/{paper_id}",
+            title=title,
+            authors=[SimpleNamespace(name=f"Author {rng.randint(1, 500)}") for _ in range(3)],
+            published=datetime(2024, 1, 1, tzinfo=timezone.utc) - timedelta(days=rng.randint(0, 3650)),
+            summary=summary,
+            pdf_url=f"http://arxiv.org/pdf/{paper_id}"
+        )
+
+    def results(self, search_query: str, max_results: int):
+        for i in range(max_results):
+            if i % self.page_size == 0 and self.page_latency:
+                time.sleep(self.page_latency)
+            yield self.make_result(search_query, i)
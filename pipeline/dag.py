@@ -0,0 +1,68 @@
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+class StageGraph:
+    """A set of named pipeline stages with dependencies, run with independent stages in parallel."""
+
+    def __init__(self):
+        self.stages = {}  # name -> (function, dependency names)
+
+    def add(self, name: str, fn, deps: tuple = ()):
+        """
+        Registers a stage.
+
+        Args:
+            name (str): The stage name; its result is stored under this key.
+            fn: A callable taking a dict of {dependency name: result} and returning the stage result.
+            deps (tuple): Names of the stages whose results this stage needs.
+        """
+        self.stages[name] = (fn, tuple(deps))
+        return self
+
+    def run(self, results: dict = None, max_workers: int = 4, on_start=None, on_done=None):
+        """
+        Runs every stage without a result, each as soon as its dependencies are available.
+
+        Args:
+            results (dict): Results of stages that already finished; those stages are skipped.
+            max_workers (int): The maximum number of stages running at once.
+            on_start: Optional callback(name) called when a stage starts.
+            on_done: Optional callback(name, result) called when a stage finishes.
+
+        Returns:
+            tuple: (results, timeline), where timeline lists {'stage', 'start', 'end'} dicts
+                with times in seconds since the run started.
+        """
+        results = dict(results or {})
+        pending = [name for name in self.stages if name not in results]
+        timeline = []
+        origin = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage") as pool:
+            running = {}
+            while pending or running:
+                for name in list(pending):
+                    fn, deps = self.stages[name]
+                    if all(dep in results for dep in deps):
+                        pending.remove(name)
+                        if on_start:
+                            on_start(name)
+                        inputs = {dep: results[dep] for dep in deps}
+                        # Each stage runs in a copy of the caller's context, so context-bound state (e.g. metric collection) carries over
+                        future = pool.submit(contextvars.copy_context().run, fn, inputs)
+                        running[future] = (name, time.perf_counter() - origin)
+
+                if not running:
+                    raise ValueError(f"Stages with unsatisfiable dependencies: {', '.join(pending)}")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, start = running.pop(future)
+                    # Re-raises a stage's exception; stages already running are allowed to finish
+                    results[name] = future.result()
+                    timeline.append({'stage': name, 'start': start, 'end': time.perf_counter() - origin})
+                    if on_done:
+                        on_done(name, results[name])
+
+        return results, timeline
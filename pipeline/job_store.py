@@ -0,0 +1,84 @@
+import json
+import time
+
+from tools.sqlite_store import SQLiteStore
+
+class JobStore(SQLiteStore):
+    """Persists research brief jobs and their finished stage results so jobs can resume after a restart."""
+
+    def __init__(self, db_path: str = "./jobs.db", max_age_seconds: int = 7 * 24 * 3600):
+        """
+        Initializes the JobStore.
+
+        Args:
+            db_path (str): The path to the SQLite database file.
+            max_age_seconds (int): Finished jobs older than this are deleted on start-up. None keeps them.
+        """
+        super().__init__(db_path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                request_key TEXT NOT NULL,
+                params TEXT NOT NULL,
+                status TEXT NOT NULL,
+                error TEXT,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS job_stages (
+                job_id TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                result TEXT NOT NULL,
+                PRIMARY KEY (job_id, stage)
+            )
+            """
+        )
+        if max_age_seconds is not None:
+            cutoff = time.time() - max_age_seconds
+            self._conn.execute(
+                "DELETE FROM job_stages WHERE job_id IN (SELECT job_id FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?)",
+                (cutoff,)
+            )
+            self._conn.execute("DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?", (cutoff,))
+        self._conn.commit()
+
+    def save_job(self, job_id: str, request_key: str, params: dict, status: str, error: str = None):
+        """Creates or updates a job's record."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, request_key, params, status, error, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, request_key, json.dumps(params), status, error, time.time())
+            )
+            self._conn.commit()
+
+    def save_stage(self, job_id: str, stage: str, result):
+        """Persists the result of a finished stage."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO job_stages (job_id, stage, result) VALUES (?, ?, ?)",
+                (job_id, stage, json.dumps(result))
+            )
+            self._conn.commit()
+
+    def load_stages(self, job_id: str) -> dict:
+        """Returns the persisted stage results of a job, keyed by stage name."""
+        with self._lock:
+            rows = self._conn.execute("SELECT stage, result FROM job_stages WHERE job_id = ?", (job_id,)).fetchall()
+        return {stage: json.loads(result) for stage, result in rows}
+
+    def incomplete_jobs(self) -> list:
+        """
+        Lists jobs that were queued or running when the process stopped.
+
+        Returns:
+            list: (job_id, request_key, params) tuples.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id, request_key, params FROM jobs WHERE status IN ('queued', 'running') ORDER BY updated_at"
+            ).fetchall()
+        return [(job_id, request_key, json.loads(params)) for job_id, request_key, params in rows]
@@ -0,0 +1,341 @@
+import hashlib
+import json
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from pipeline.dag import StageGraph
+from tools.artifact_store import ArtifactStore
+from tools.metrics import metrics, summarize_spans
+from tools.research_brief import ResearchBrief
+
+class ResearchBriefJob:
+    """One research brief generation, run as a stage graph with resumable results.
+
+    Stages and their dependencies:
+
+        search -> summaries          -> executive_summary -> report
+               -> relations          -> mindmap_image     ->
+
+    Mind-map extraction only needs the abstracts, so it runs alongside summarization,
+    and rendering the mind map overlaps with writing the executive summary.
+    """
+
+    STAGES = ["search", "summaries", "relations", "executive_summary", "mindmap_image", "report"]
+    # Stages whose result is the ArtifactStore key of a rendered file, so no image or PDF bytes are persisted with the job
+    ARTIFACT_STAGES = ["mindmap_image", "report"]
+
+    def __init__(self, job_id: str, params: dict, stage_results: dict = None):
+        """
+        Initializes the ResearchBriefJob.
+
+        Args:
+            job_id (str): The unique job ID.
+            params (dict): The request: 'topic', 'max_papers' and 'year'.
+            stage_results (dict): Results of stages that already finished, e.g. loaded after a restart.
+        """
+        self.job_id = job_id
+        self.params = params
+        self.stage_results = {name: result for name, result in (stage_results or {}).items() if name in self.STAGES}
+        self.status = "queued"
+        self.running_stages = []
+        self.error = None
+        # Start/end times (seconds since the run started) of each stage executed in this process
+        self.timeline = []
+        # Metric span records (see tools.metrics) of the operations run for this job in this process
+        self.spans = []
+        # Text streamed so far by running stages, for live display
+        self.partial = {}
+        # The bytes behind each finished artifact stage, keyed by stage name
+        self.artifacts = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def request_key(params: dict) -> str:
+        """Returns the key under which identical requests are coalesced."""
+        normalized = {
+            'topic': " ".join(params['topic'].lower().split()),
+            'max_papers': params['max_papers'],
+            'year': params.get('year')
+        }
+        return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def snapshot(self) -> dict:
+        """
+        Returns a consistent copy of the job's state for progress polling.
+
+        Returns:
+            dict: 'job_id', 'status', 'stages' (currently running), 'progress' (0-1), 'error',
+                'partial', 'timeline' and, once done, 'results' in the shape the app displays.
+        """
+        with self._lock:
+            finished = sum(1 for stage in self.STAGES if stage in self.stage_results)
+            snapshot = {
+                'job_id': self.job_id,
+                'status': self.status,
+                'stages': list(self.running_stages),
+                'progress': finished / len(self.STAGES),
+                'error': self.error,
+                'partial': {key: list(value) if isinstance(value, list) else value for key, value in self.partial.items()},
+                'timeline': list(self.timeline),
+                'results': None
+            }
+            if self.status == "done":
+                snapshot['results'] = self._results()
+            return snapshot
+
+    def _results(self) -> dict:
+        """Flattens the stage results into the app's results dictionary."""
+        return {
+            'topic': self.params['topic'],
+            'top_papers': self.stage_results.get('search', []),
+            'summaries': self.stage_results.get('summaries', {}),
+            'mindmap_image': self.artifacts.get('mindmap_image'),
+            'executive_summary': self.stage_results.get('executive_summary'),
+            'pdf_bytes': self.artifacts.get('report'),
+            'timeline': list(self.timeline),
+            'performance': summarize_spans(self.spans),
+        }
+
+    def _set(self, **fields):
+        with self._lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+
+    def build_graph(self, components: dict) -> StageGraph:
+        """
+        Wires the stages to the components they use.
+
+        Args:
+            components (dict): The 'vector_manager', 'summarizer', 'mindmapper', 'exporter'
+                and 'artifact_store' used by this job.
+
+        Returns:
+            StageGraph: The brief's stage graph.
+        """
+        graph = StageGraph()
+        graph.add("search", lambda inputs: self._run_search(components))
+        graph.add("summaries", lambda inputs: self._run_summaries(components, inputs['search']), deps=["search"])
+        graph.add("relations", lambda inputs: self._run_relations(components, inputs['search']), deps=["search"])
+        graph.add(
+            "executive_summary",
+            lambda inputs: self._run_executive_summary(components, inputs['summaries']),
+            deps=["summaries"]
+        )
+        graph.add(
+            "mindmap_image",
+            lambda inputs: self._run_mindmap_image(components, inputs['relations']),
+            deps=["relations"]
+        )
+        graph.add(
+            "report",
+            lambda inputs: self._run_report(components, inputs),
+            deps=["search", "summaries", "executive_summary", "mindmap_image"]
+        )
+        return graph
+
+    def run(self, components: dict, store, max_parallel_stages: int = 4):
+        """
+        Runs every stage that has no result yet, persisting each result as it finishes.
+
+        Args:
+            components (dict): The components used by the stages (see `build_graph`).
+            store (JobStore): Where stage results are persisted.
+            max_parallel_stages (int): The maximum number of stages running at once.
+        """
+        def on_start(name):
+            with self._lock:
+                self.running_stages.append(name)
+
+        def on_done(name, result):
+            with self._lock:
+                self.stage_results[name] = result
+                self.running_stages.remove(name)
+            store.save_stage(self.job_id, name, result)
+
+        artifact_store = components['artifact_store']
+        for name in self.ARTIFACT_STAGES:
+            key = self.stage_results.get(name)
+            if key is None:
+                continue
+            # Older job files stored the bytes themselves instead of a key
+            data = artifact_store.get(key) if isinstance(key, str) else None
+            with self._lock:
+                if data is None:
+                    # Evicted since the key was saved, so the stage runs again
+                    del self.stage_results[name]
+                else:
+                    self.artifacts[name] = data
+
+        with metrics.collect_run() as spans:
+            try:
+                _, timeline = self.build_graph(components).run(
+                    results=dict(self.stage_results),
+                    max_workers=max_parallel_stages,
+                    on_start=on_start,
+                    on_done=on_done
+                )
+                for entry in timeline:
+                    metrics.observe(f"stage.{entry['stage']}", entry['end'] - entry['start'])
+            finally:
+                self._set(spans=spans)
+        self._set(timeline=timeline)
+        print("Stage timeline: " + ", ".join(f"{t['stage']}={t['start']:.2f}-{t['end']:.2f}s" for t in timeline))
+
+    def _run_search(self, components: dict) -> list:
+        max_papers = self.params['max_papers']
+        return components['vector_manager'].retrieve_papers(
+            query=self.params['topic'],
+            top_n=max_papers,
+            max_results=max_papers * 2,
+            year=self.params.get('year')
+        )
+
+    def _run_summaries(self, components: dict, papers: list) -> dict:
+        texts = [""] * len(papers)
+        with self._lock:
+            self.partial['titles'] = [paper.get('title') for paper in papers]
+            self.partial['summaries'] = texts
+        for i, text in components['summarizer'].stream_many([p.get('summary') for p in papers], max_concurrency=4):
+            with self._lock:
+                texts[i] = text
+        return {paper.get('title'): text for paper, text in zip(papers, texts)}
+
+    def _run_relations(self, components: dict, papers: list) -> list:
+        relationships = components['mindmapper'].generate_mindmap_data([p.get('summary', '') for p in papers])
+        # Weights are kept with each edge so a resumed job prunes the mind map the same way
+        return [list(rel) for rel in relationships]
+
+    def _run_executive_summary(self, components: dict, summaries: dict) -> str:
+        if not summaries:
+            return ""
+        chunks = []
+        for chunk in components['exporter'].stream_executive_summary(list(summaries.values())):
+            chunks.append(chunk)
+            with self._lock:
+                self.partial['executive_summary'] = "".join(chunks)
+        return "".join(chunks)
+
+    def _run_mindmap_image(self, components: dict, relations: list):
+        if not relations:
+            return None
+        relationships = [tuple(rel) for rel in relations]
+        # The shared store lets identical renders be reused across jobs and sessions
+        store = components['artifact_store']
+        key = ArtifactStore.make_key("mindmap.png", repr(relationships))
+        image = store.get(key)
+        if image is None:
+            image = components['mindmapper'].render_mindmap(relationships)
+            if not image:
+                return None
+            store.put(key, image)
+        with self._lock:
+            self.artifacts['mindmap_image'] = image
+        return key
+
+    def _run_report(self, components: dict, inputs: dict):
+        if not inputs['search']:
+            return None
+        # The exporter only renders; all LLM output is computed upstream and passed in
+        brief = ResearchBrief(
+            topic=self.params['topic'],
+            papers=inputs['search'],
+            summaries=inputs['summaries'],
+            executive_summary=inputs['executive_summary'],
+            mindmap_image=self.artifacts.get('mindmap_image')
+        )
+        store = components['artifact_store']
+        key = ArtifactStore.make_key("brief.pdf", brief.fingerprint())
+        pdf = store.get(key)
+        if pdf is None:
+            pdf = components['exporter'].render_pdf(brief)
+            store.put(key, pdf)
+        with self._lock:
+            self.artifacts['report'] = pdf
+        return key
+
+class JobManager:
+    """Runs research brief jobs in a worker pool, off the Streamlit script thread."""
+
+    def __init__(self, component_factory, store, max_workers: int = 2, resume: bool = True, max_finished: int = 100):
+        """
+        Initializes the JobManager.
+
+        Args:
+            component_factory: A callable returning a fresh dict of per-job components
+                (see ResearchBriefJob.run); heavy resources inside it should be shared.
+            store (JobStore): Where jobs and stage results are persisted.
+            max_workers (int): The number of briefs generated concurrently.
+            resume (bool): Re-queue jobs that were unfinished when the process last stopped.
+            max_finished (int): How many finished jobs are kept in memory for polling.
+        """
+        self.max_finished = max_finished
+        self.component_factory = component_factory
+        self.store = store
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="brief-job")
+        self._jobs = {}
+        self._in_flight = {}  # request key -> job ID
+        self._finished = deque()
+        self._lock = threading.Lock()
+
+        if resume:
+            for job_id, request_key, params in store.incomplete_jobs():
+                job = ResearchBriefJob(job_id, params, stage_results=store.load_stages(job_id))
+                self._enqueue(job, request_key)
+
+    def submit(self, topic: str, max_papers: int = 5, year: int = None) -> str:
+        """
+        Queues a brief, or joins an identical one that is already queued or running.
+
+        Args:
+            topic (str): The research topic.
+            max_papers (int): The number of papers to analyze.
+            year (int): Optional filter for the publication year.
+
+        Returns:
+            str: The ID to poll with `get`.
+        """
+        params = {'topic': topic, 'max_papers': int(max_papers), 'year': int(year) if year else None}
+        request_key = ResearchBriefJob.request_key(params)
+        with self._lock:
+            if request_key in self._in_flight:
+                return self._in_flight[request_key]
+            job = ResearchBriefJob(uuid.uuid4().hex, params)
+            self._enqueue(job, request_key)
+        return job.job_id
+
+    def get(self, job_id: str):
+        """
+        Returns a job's progress snapshot (see ResearchBriefJob.snapshot), or None if the ID is unknown.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job.snapshot() if job is not None else None
+
+    def _enqueue(self, job: ResearchBriefJob, request_key: str):
+        # Callers hold self._lock, except during start-up when no other thread can see the manager yet
+        self._jobs[job.job_id] = job
+        self._in_flight[request_key] = job.job_id
+        self.store.save_job(job.job_id, request_key, job.params, "queued")
+        self._pool.submit(self._run, job, request_key)
+
+    def _run(self, job: ResearchBriefJob, request_key: str):
+        job._set(status="running")
+        self.store.save_job(job.job_id, request_key, job.params, "running")
+        try:
+            job.run(self.component_factory(), self.store)
+            job._set(status="done")
+            self.store.save_job(job.job_id, request_key, job.params, "done")
+        except Exception as e:
+            print(f"An error occurred while generating the research brief: {e}")
+            job._set(status="failed", error=str(e))
+            self.store.save_job(job.job_id, request_key, job.params, "failed", error=str(e))
+        finally:
+            with self._lock:
+                if self._in_flight.get(request_key) == job.job_id:
+                    del self._in_flight[request_key]
+                # Finished jobs hold their PDFs in memory, so only the most recent ones are kept
+                self._finished.append(job.job_id)
+                while len(self._finished) > self.max_finished:
+                    self._jobs.pop(self._finished.popleft(), None)
@@ -0,0 +1,145 @@
+"""
+Process-wide shared resources.
+
+Streamlit runs every browser session in the same process, so the expensive
+objects (the embedding model, the ChromaDB client, the LLM clients and the
+caches) are created once here and shared by all sessions. Per-session objects
+such as VectorManager and the agents are cheap wrappers around them.
+"""
+import logging
+import os
+import threading
+from collections import defaultdict
+
+import chromadb
+from langchain_community.llms import Ollama
+from sentence_transformers import SentenceTransformer
+
+from agents.summarizer_agent import SummarizerAgent
+from pipeline.job_store import JobStore
+from pipeline.jobs import JobManager
+from tools.artifact_store import ArtifactStore
+from tools.llm_cache import LLMCache
+from tools.metrics import metrics
+from tools.mindmap_generator import MindmapGenerator
+from tools.pdf_exporter import PDFExporter
+from vector_store.bm25_index import BM25Index
+from vector_store.embeddings import CachedSentenceTransformerEmbedding
+from vector_store.query_log import QueryLog
+from vector_store.vector_manager import VectorManager
+
+_resources = {}
+_locks = defaultdict(threading.Lock)
+_registry_lock = threading.Lock()
+
+def _get_or_create(key, factory):
+    """Returns the shared resource for `key`, creating it exactly once even under concurrent first use."""
+    resource = _resources.get(key)
+    if resource is not None:
+        return resource
+    with _registry_lock:
+        lock = _locks[key]
+    # A per-key lock, so a slow model load doesn't block unrelated resources
+    with lock:
+        if key not in _resources:
+            _resources[key] = factory()
+        return _resources[key]
+
+def get_embedding_function(model_name: str = "all-MiniLM-L6-v2"):
+    """Returns the shared embedding function wrapping a single loaded SentenceTransformer."""
+    return _get_or_create(("embedding_function", model_name), lambda: CachedSentenceTransformerEmbedding(SentenceTransformer(model_name)))
+
+def get_chroma_client(db_path: str = "./chroma_db"):
+    """Returns the shared ChromaDB client for a database directory."""
+    return _get_or_create(("chroma_client", db_path), lambda: chromadb.PersistentClient(path=db_path))
+
+def get_lexical_index(db_path: str = "./chroma_db"):
+    """Returns the shared BM25 index stored alongside a ChromaDB database."""
+    return _get_or_create(("lexical_index", db_path), lambda: BM25Index(os.path.join(db_path, "bm25_index.db")))
+
+def get_query_log(db_path: str = "./chroma_db"):
+    """Returns the shared query log stored alongside a ChromaDB database."""
+    return _get_or_create(("query_log", db_path), lambda: QueryLog(os.path.join(db_path, "query_log.db")))
+
+def get_llm(model: str = "mistral"):
+    """Returns the shared Ollama LLM client for a model."""
+    return _get_or_create(("llm", model), lambda: Ollama(model=model))
+
+def get_llm_cache(db_path: str = "./llm_cache.db"):
+    """Returns the shared LLM output cache."""
+    return _get_or_create(("llm_cache", db_path), lambda: LLMCache(db_path))
+
+def get_artifact_store(root: str = "./artifacts"):
+    """Returns the shared artifact store."""
+    return _get_or_create(("artifact_store", root), lambda: ArtifactStore(root))
+
+def init_metrics():
+    """
+    Sets up metric export once per process, driven by environment variables:
+
+    - PAPERPILOT_METRICS_LOG: a file path (or '-' for stderr) receiving one JSON record per timed operation.
+    - PAPERPILOT_METRICS_PORT: a local port serving Prometheus metrics at /metrics.
+
+    Returns:
+        MetricsRegistry: The process-wide metrics registry.
+    """
+    def configure():
+        log_target = os.environ.get("PAPERPILOT_METRICS_LOG")
+        if log_target:
+            handler = logging.StreamHandler() if log_target == "-" else logging.FileHandler(log_target)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger = logging.getLogger("paperpilot.metrics")
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+        port = os.environ.get("PAPERPILOT_METRICS_PORT")
+        if port:
+            try:
+                metrics.start_server(int(port))
+            except OSError as e:
+                # e.g. the port is taken by another app instance; metrics are still recorded, just not served
+                print(f"Could not serve metrics on port {port}, continuing without the endpoint: {e}")
+        return metrics
+    return _get_or_create(("metrics",), configure)
+
+def create_vector_manager(db_path: str = "./chroma_db", **kwargs):
+    """Creates a per-session VectorManager on top of the shared embedding model, ChromaDB client and indexes."""
+    manager = VectorManager(
+        db_path=db_path,
+        embedding_function=get_embedding_function(),
+        client=get_chroma_client(db_path),
+        lexical_index=get_lexical_index(db_path),
+        query_log=get_query_log(db_path),
+        **kwargs
+    )
+    # The shared index only needs catching up with the collection once per process
+    _get_or_create(("lexical_index_synced", db_path), lambda: manager.sync_lexical_index() or True)
+    return manager
+
+def create_agents(model: str = "mistral") -> dict:
+    """
+    Creates the per-session agents on top of the shared LLM client, cache and embedding model.
+
+    Returns:
+        dict: The 'summarizer', 'mindmapper' and 'exporter' instances.
+    """
+    llm = get_llm(model)
+    cache = get_llm_cache()
+    return {
+        'summarizer': SummarizerAgent(model=model, llm=llm, cache=cache),
+        'mindmapper': MindmapGenerator(model=model, llm=llm, cache=cache),
+        'exporter': PDFExporter(model=model, llm=llm, cache=cache),
+    }
+
+def create_job_components(model: str = "mistral") -> dict:
+    """Creates the per-job components used by ResearchBriefJob, on top of the shared resources."""
+    components = create_agents(model=model)
+    components['vector_manager'] = create_vector_manager()
+    components['artifact_store'] = get_artifact_store()
+    return components
+
+def get_job_manager(db_path: str = "./jobs.db", max_workers: int = 2):
+    """Returns the shared background job manager; unfinished jobs from a previous run are resumed."""
+    return _get_or_create(
+        ("job_manager", db_path),
+        lambda: JobManager(create_job_components, JobStore(db_path), max_workers=max_workers)
+    )
@@ -0,0 +1,43 @@
+import os
+import time
+from typing import Any, Callable, Iterator, List, Optional
+
+import pytest
+from langchain_core.outputs import GenerationChunk
+
+from benchmarks.fakes import FakeLLM, HashingEmbeddingModel
+from vector_store.embeddings import CachedSentenceTransformerEmbedding
+from vector_store.vector_manager import VectorManager
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+class ScriptedLLM(FakeLLM):
+    """A fake LLM answering each prompt with `script(prompt)` after `latency` seconds; exceptions from the script surface as model errors."""
+
+    script: Callable[[str], str]
+    latency: float = 0.0
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> str:
+        time.sleep(self.latency)
+        return self.script(prompt)
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> Iterator[GenerationChunk]:
+        yield GenerationChunk(text=self._call(prompt))
+
+@pytest.fixture
+def scripted_llm():
+    """Builds a ScriptedLLM from a script function (and an optional latency)."""
+    return lambda script, latency=0.0: ScriptedLLM(script=script, latency=latency)
+
+@pytest.fixture
+def arxiv_feeds() -> list:
+    """Two recorded arXiv result pages; the last paper of the first page is repeated on the second."""
+    return [os.path.join(FIXTURES, "arxiv", name) for name in ("page1.xml", "page2.xml")]
+
+@pytest.fixture
+def make_manager(tmp_path):
+    """Builds a VectorManager in a temporary directory, with small hashing embeddings and the given source."""
+    def make(source) -> VectorManager:
+        embedding_function = CachedSentenceTransformerEmbedding(HashingEmbeddingModel(dim=32))
+        return VectorManager(db_path=str(tmp_path), source=source, embedding_function=embedding_function)
+    return make
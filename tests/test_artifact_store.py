@@ -0,0 +1,38 @@
+import os
+import threading
+
+from tools.artifact_store import ArtifactStore
+
+def test_get_returns_artifact_evicted_while_reading(tmp_path, monkeypatch):
+    store = ArtifactStore(str(tmp_path))
+    store.put("key", b"image")
+
+    def evicted(path):
+        os.remove(path)
+        raise FileNotFoundError(path)
+    monkeypatch.setattr(os, "utime", evicted)
+
+    assert store.get("key") == b"image"
+    assert store.get("key") is None
+
+def test_concurrent_reads_and_evicting_writes(tmp_path):
+    # Room for about two artifacts, so almost every put evicts something
+    stores = [ArtifactStore(str(tmp_path), max_bytes=2048) for _ in range(2)]
+    errors = []
+
+    def work(store, worker):
+        try:
+            for i in range(200):
+                key = f"artifact-{(worker + i) % 8}"
+                if store.get(key) is None:
+                    store.put(key, os.urandom(1024))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(stores[i % 2], i)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
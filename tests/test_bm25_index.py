@@ -0,0 +1,95 @@
+import sqlite3
+import threading
+
+from vector_store.bm25_index import BM25Index
+
+DOCS = {
+    "a": "LoRA adapters for efficient fine-tuning of large language models",
+    "b": "Graph neural networks for molecular property prediction",
+    "c": "Sparse attention lets transformers read long documents",
+    "d": "Diffusion models for protein structure generation",
+    "e": "Hybrid retrieval with BM25 and dense vectors for question answering",
+}
+
+def test_indexes_sharing_a_file_can_write_concurrently(tmp_path):
+    path = str(tmp_path / "bm25.db")
+    indexes = [BM25Index(path) for _ in range(4)]
+    ids = [f"doc-{i}" for i in range(200)]
+    texts = [f"paper {i} about topic{i % 7} and method{i % 11}" for i in range(200)]
+    errors, added = [], []
+
+    def ingest(index):
+        try:
+            # Every index writes the same documents, in overlapping batches
+            for offset in range(0, len(ids), 25):
+                added.append(index.add_documents(ids[offset:offset + 50], texts[offset:offset + 50]))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=ingest, args=(index,)) for index in indexes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sum(added) == 200
+    assert all(len(index) == 200 for index in indexes)
+
+def test_scores_reflect_documents_added_by_another_index(tmp_path):
+    path = str(tmp_path / "bm25.db")
+    reader, writer = BM25Index(path), BM25Index(path)
+    writer.add_documents(list(DOCS), list(DOCS.values()))
+
+    assert reader.search("graph neural networks") == writer.search("graph neural networks")
+    assert reader.search("graph neural networks")[0][0] == "b"
+
+def test_candidate_restriction_matches_filtered_full_search(tmp_path):
+    index = BM25Index(str(tmp_path / "bm25.db"))
+    index.add_documents(list(DOCS), list(DOCS.values()))
+
+    full = index.search("models for generation", top_n=10)
+    restricted = index.search("models for generation", top_n=10, candidate_ids=["a", "d", "missing"])
+
+    assert restricted == [(doc_id, score) for doc_id, score in full if doc_id in {"a", "d"}]
+    assert index.search("models", candidate_ids=[]) == []
+
+def test_stop_words_are_skipped(tmp_path):
+    index = BM25Index(str(tmp_path / "bm25.db"))
+    index.add_documents(list(DOCS), list(DOCS.values()))
+
+    assert index.search("for the of") == []
+    # 'for' appears in four of five abstracts; only 'protein' decides the ranking
+    assert [doc_id for doc_id, _ in index.search("for protein")] == ["d"]
+
+def test_common_topic_terms_still_count(tmp_path):
+    # A per-topic corpus, where the topic's own acronym is in most documents
+    docs = {
+        "lora-1": "LoRA adapters for large language models",
+        "lora-2": "Scaling LoRA to many tasks",
+        "lora-3": "LoRA rank selection",
+        "lora-4": "Merging LoRA modules",
+        "lora-quant": "LoRA with quantization of the base model",
+        "quant": "Post-training quantization of vision models",
+    }
+    index = BM25Index(str(tmp_path / "bm25.db"))
+    index.add_documents(list(docs), list(docs.values()))
+
+    ranked = [doc_id for doc_id, _ in index.search("LoRA quantization", top_n=10)]
+
+    assert ranked[0] == "lora-quant"
+    assert set(ranked) == set(docs)
+
+def test_statistics_are_built_for_existing_files(tmp_path):
+    path = str(tmp_path / "bm25.db")
+    BM25Index(path).add_documents(list(DOCS), list(DOCS.values()))
+    expected = BM25Index(path).search("graph neural networks")
+    # Simulate an index written before the statistics tables existed
+    conn = sqlite3.connect(path)
+    conn.executescript("DROP TABLE terms; DROP TABLE corpus;")
+    conn.close()
+
+    index = BM25Index(path)
+
+    assert len(index) == 5
+    assert index.search("graph neural networks") == expected
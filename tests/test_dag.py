@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+from pipeline.dag import StageGraph
+
+def sleeper(seconds: float, value):
+    """Returns a stage function that takes `seconds` and returns `value`."""
+    def run(inputs):
+        time.sleep(seconds)
+        return value
+    return run
+
+def test_independent_stages_overlap():
+    graph = StageGraph()
+    graph.add("search", sleeper(0.05, ["paper"]))
+    graph.add("summaries", sleeper(0.3, "summaries"), deps=["search"])
+    graph.add("relations", sleeper(0.3, "relations"), deps=["search"])
+    graph.add("report", lambda inputs: (inputs['summaries'], inputs['relations']), deps=["summaries", "relations"])
+
+    results, timeline = graph.run(max_workers=4)
+
+    spans = {entry['stage']: (entry['start'], entry['end']) for entry in timeline}
+    assert results['report'] == ("summaries", "relations")
+    assert spans['summaries'][0] >= spans['search'][1]
+    assert spans['summaries'][0] < spans['relations'][1] and spans['relations'][0] < spans['summaries'][1]
+    assert spans['report'][0] >= max(spans['summaries'][1], spans['relations'][1])
+    # Run one after the other, the two slow stages would take 0.6s
+    assert spans['report'][1] < 0.05 + 0.3 * 1.8
+
+def test_stages_with_results_are_skipped():
+    calls = []
+    def stage(name):
+        def run(inputs):
+            calls.append(name)
+            return f"{name}({', '.join(inputs.values())})"
+        return run
+    graph = StageGraph()
+    graph.add("search", stage("search"))
+    graph.add("summaries", stage("summaries"), deps=["search"])
+    graph.add("report", stage("report"), deps=["summaries"])
+    started, finished = [], []
+
+    results, timeline = graph.run(results={'search': "cached"}, on_start=started.append,
+                                  on_done=lambda name, result: finished.append(name))
+
+    assert calls == started == finished == ["summaries", "report"]
+    assert [entry['stage'] for entry in timeline] == ["summaries", "report"]
+    assert results['report'] == "report(summaries(cached))"
+
+def test_unsatisfiable_dependencies_raise():
+    graph = StageGraph()
+    graph.add("search", sleeper(0.0, []))
+    graph.add("report", sleeper(0.0, None), deps=["search", "missing"])
+
+    with pytest.raises(ValueError, match="report"):
+        graph.run()
+
+def test_stage_exception_propagates():
+    graph = StageGraph()
+    graph.add("search", sleeper(0.0, []))
+    graph.add("summaries", lambda inputs: 1 / 0, deps=["search"])
+    graph.add("report", sleeper(0.0, None), deps=["summaries"])
+    finished = []
+
+    with pytest.raises(ZeroDivisionError):
+        graph.run(on_done=lambda name, result: finished.append(name))
+
+    assert finished == ["search"]
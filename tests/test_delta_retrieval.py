@@ -0,0 +1,43 @@
+import re
+import time
+from datetime import datetime, timezone
+
+from vector_store.arxiv_source import RecordedArxivSource
+from vector_store.vector_manager import DELTA_OVERLAP_SECONDS
+
+class LoggingSource(RecordedArxivSource):
+    """Replays recorded feeds and remembers every search query it was asked for."""
+
+    def __init__(self, feed_paths: list):
+        super().__init__(feed_paths)
+        self.queries = []
+
+    def results(self, search_query: str, max_results: int):
+        self.queries.append(search_query)
+        yield from super().results(search_query, max_results)
+
+def test_delta_fetch_overlaps_previous_ingestion(make_manager, arxiv_feeds):
+    manager = make_manager(LoggingSource(arxiv_feeds))
+    before = time.time()
+    manager.retrieve_papers("graph neural networks", min_local_papers=100)
+
+    manager.source = LoggingSource([])
+    manager.retrieve_papers("graph neural networks", min_local_papers=100)
+
+    start = re.search(r"submittedDate: \[(\d{12}) TO", manager.source.queries[0]).group(1)
+    since = datetime.strptime(start, "%Y%m%d%H%M").replace(tzinfo=timezone.utc).timestamp()
+    assert before - DELTA_OVERLAP_SECONDS - 60 <= since <= before - DELTA_OVERLAP_SECONDS + 60
+    assert manager.last_retrieval['source'] == 'arxiv-delta'
+
+def test_delta_fetch_keeps_papers_stored_by_other_queries(make_manager, arxiv_feeds):
+    manager = make_manager(LoggingSource(arxiv_feeds))
+    # Another topic stores the papers first, so they are not tagged with the query below
+    manager.stream_and_process_papers("machine learning", max_results=10)
+    manager.retrieve_papers("graph neural networks", min_local_papers=100)
+    first_candidates = set(manager.last_candidate_ids)
+
+    manager.source = LoggingSource([])
+    manager.retrieve_papers("graph neural networks", min_local_papers=100)
+
+    assert len(first_candidates) == 5
+    assert first_candidates <= set(manager.last_candidate_ids)
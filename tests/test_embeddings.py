@@ -0,0 +1,27 @@
+import chromadb
+import numpy as np
+
+from benchmarks.fakes import HashingEmbeddingModel
+from vector_store.embeddings import CachedSentenceTransformerEmbedding
+
+def test_embed_query_caches_normalized_vectors():
+    embed = CachedSentenceTransformerEmbedding(HashingEmbeddingModel(dim=32), query_cache_size=2)
+
+    first = embed.embed_query("graph neural networks")
+
+    assert first.dtype == np.float32
+    assert np.isclose(np.linalg.norm(first), 1.0)
+    assert embed.embed_query("graph neural networks") is first
+
+def test_collection_can_be_queried_by_text(tmp_path):
+    embed = CachedSentenceTransformerEmbedding(HashingEmbeddingModel(dim=32))
+    collection = chromadb.PersistentClient(path=str(tmp_path)).get_or_create_collection(
+        name="research_papers",
+        embedding_function=embed,
+        metadata={"hnsw:space": "cosine"}
+    )
+    collection.add(ids=["a", "b"], documents=["graph neural networks", "quantum computing"])
+
+    results = collection.query(query_texts=["quantum computing"], n_results=1)
+
+    assert results['ids'] == [["b"]]
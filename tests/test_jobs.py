@@ -0,0 +1,119 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from agents.summarizer_agent import SummarizerAgent
+from benchmarks.fakes import FakeLLM, SyntheticArxivSource
+from pipeline.job_store import JobStore
+from pipeline.jobs import JobManager, ResearchBriefJob
+from tools.artifact_store import ArtifactStore
+from tools.mindmap_generator import MindmapGenerator
+from tools.pdf_exporter import PDFExporter
+
+@pytest.fixture
+def components(make_manager, tmp_path):
+    """Builds fake per-job components (see ResearchBriefJob.build_graph) sharing one artifact store."""
+    llm = FakeLLM(latency=0.0, tokens_per_second=1e6, response_tokens=16)
+    artifact_store = ArtifactStore(str(tmp_path / "artifacts"))
+    return lambda: {
+        'vector_manager': make_manager(SyntheticArxivSource(page_size=10)),
+        'summarizer': SummarizerAgent(llm=llm),
+        'mindmapper': MindmapGenerator(llm=llm),
+        'exporter': PDFExporter(llm=llm),
+        'artifact_store': artifact_store,
+    }
+
+def wait_for(manager: JobManager, job_id: str, timeout: float = 30.0) -> dict:
+    """Polls a job until it finishes and returns its snapshot."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job['status'] in ("done", "failed"):
+            return job
+        time.sleep(0.02)
+    raise TimeoutError(job_id)
+
+def test_rendered_files_are_stored_as_artifact_keys(components, tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    manager = JobManager(components, JobStore(db_path), resume=False)
+
+    job = wait_for(manager, manager.submit("quantum computing", max_papers=3))
+
+    assert job['status'] == "done"
+    assert job['results']['pdf_bytes'].startswith(b"%PDF")
+    assert job['results']['mindmap_image'].startswith(b"\x89PNG")
+    conn = sqlite3.connect(db_path)
+    stored = dict(conn.execute("SELECT stage, result FROM job_stages WHERE job_id = ?", (job['job_id'],)).fetchall())
+    conn.close()
+    artifact_store = components()['artifact_store']
+    assert artifact_store.get(json.loads(stored['report'])) == job['results']['pdf_bytes']
+    assert artifact_store.get(json.loads(stored['mindmap_image'])) == job['results']['mindmap_image']
+
+def test_resume_rerenders_evicted_artifacts(components, tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    params = {'topic': "quantum computing", 'max_papers': 3, 'year': None}
+    ResearchBriefJob("job-1", params).run(components(), store)
+    artifact_root = components()['artifact_store'].root
+    for name in os.listdir(artifact_root):
+        os.remove(os.path.join(artifact_root, name))
+
+    resumed = ResearchBriefJob("job-1", params, stage_results=store.load_stages("job-1"))
+    resumed.run(components(), store)
+
+    assert {entry['stage'] for entry in resumed.timeline} == {"mindmap_image", "report"}
+    assert resumed.artifacts['report'].startswith(b"%PDF")
+
+def test_identical_in_flight_requests_are_coalesced(components, tmp_path):
+    release = threading.Event()
+    def gated_components():
+        release.wait(timeout=10)
+        return components()
+    manager = JobManager(gated_components, JobStore(str(tmp_path / "jobs.db")), max_workers=1, resume=False)
+
+    first = manager.submit("Quantum Computing", max_papers=3)
+    same = manager.submit("  quantum   computing ", max_papers=3)
+    other = manager.submit("quantum computing", max_papers=4)
+    release.set()
+
+    assert same == first
+    assert other != first
+    assert wait_for(manager, first)['status'] == "done"
+
+def test_unfinished_jobs_resume_from_persisted_stages(components, tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    params = {'topic': "quantum computing", 'max_papers': 2, 'year': None}
+    papers = [
+        {'title': "Persisted paper A", 'authors': "A. Author", 'summary': "Qubits and error correction.", 'url': None},
+        {'title': "Persisted paper B", 'authors': "B. Author", 'summary': "Annealing for optimization.", 'url': None},
+    ]
+    summaries = {"Persisted paper A": "summary A", "Persisted paper B": "summary B"}
+    store.save_job("job-1", ResearchBriefJob.request_key(params), params, "running")
+    store.save_stage("job-1", "search", papers)
+    store.save_stage("job-1", "summaries", summaries)
+
+    manager = JobManager(components, store)
+    job = wait_for(manager, "job-1")
+
+    assert job['status'] == "done"
+    assert {entry['stage'] for entry in job['timeline']} == {"relations", "executive_summary", "mindmap_image", "report"}
+    assert job['results']['top_papers'] == papers
+    assert job['results']['summaries'] == summaries
+
+def test_failed_job_reports_its_error(components, tmp_path):
+    def failing_components():
+        parts = components()
+        parts['vector_manager'].retrieve_papers = lambda **kwargs: (_ for _ in ()).throw(RuntimeError("arXiv unreachable"))
+        return parts
+    store = JobStore(str(tmp_path / "jobs.db"))
+    manager = JobManager(failing_components, store, resume=False)
+
+    job_id = manager.submit("quantum computing", max_papers=3)
+    job = wait_for(manager, job_id)
+
+    assert job['status'] == "failed"
+    assert job['error'] == "arXiv unreachable"
+    assert job['results'] is None
@@ -0,0 +1,132 @@
+import json
+import time
+
+import numpy as np
+import pytest
+
+from benchmarks.fakes import FakeLLM
+from tools.mindmap_generator import MindmapGenerator, concept_key
+
+EXTRACTIONS = {
+    "paper one": "(Transformers) -> [use] -> (Attention)\n(LoRA) -> [adapts] -> (Transformers)",
+    "paper two": "(transformers) -> [use] -> (attention)\n(Transformers) -> [rely on] -> (Attention)",
+    "paper three": "(Transformer) -> [uses] -> (attention.)\n(Diffusion Models) -> [generate] -> (Images)",
+}
+
+# The refine pass merges relation synonyms, changes a concept's spelling and adds an edge of its own
+CONSOLIDATED = """
+(Transformer) -> [use] -> (Attention)
+(LoRA) -> [fine-tunes] -> (Transformer)
+(Diffusion Models) -> [generate] -> (Images)
+(Attention) -> [enables] -> (Long context)
+"""
+
+def extract(prompt: str) -> str:
+    """Answers map prompts from EXTRACTIONS and reduce prompts with CONSOLIDATED."""
+    if "CONSOLIDATED RELATIONSHIPS" in prompt:
+        return CONSOLIDATED
+    return next(text for paper, text in EXTRACTIONS.items() if paper in prompt)
+
+def test_refine_keeps_merged_weights(scripted_llm):
+    generator = MindmapGenerator(llm=scripted_llm(extract))
+
+    relationships = generator.generate_mindmap_data(list(EXTRACTIONS), refine=True)
+
+    weights = {(a, b): weight for a, _, b, weight in relationships}
+    # 'use', 'uses' and 'rely on' between the same two concepts support the consolidated edge
+    assert weights[("Transformer", "Attention")] == 4
+    assert weights[("LoRA", "Transformer")] == 1
+    assert weights[("Diffusion Models", "Images")] == 1
+    assert weights[("Attention", "Long context")] == 1
+    assert relationships[0] == ("Transformer", "use", "Attention", 4)
+
+def test_map_step_runs_concurrently(scripted_llm):
+    generator = MindmapGenerator(llm=scripted_llm(extract, latency=0.3))
+
+    start = time.perf_counter()
+    extractions = generator.extract_relationships_many(list(EXTRACTIONS), max_concurrency=3)
+    elapsed = time.perf_counter() - start
+
+    assert [len(relationships) for relationships in extractions] == [2, 2, 2]
+    # Sequential calls would take 0.9s
+    assert elapsed < 0.3 * 2
+
+class RecordingRenderer:
+    """Captures what the generator asks to render."""
+
+    def render(self, relationships, weights=None, fmt="png", layout="auto"):
+        self.relationships, self.weights = relationships, weights
+        return b"image"
+
+def test_render_uses_weights_stored_with_relationships(scripted_llm):
+    relationships = MindmapGenerator(llm=scripted_llm(extract)).generate_mindmap_data(list(EXTRACTIONS))
+    # As persisted by the relations stage and loaded by a resumed job, in another generator
+    stored = json.loads(json.dumps([list(rel) for rel in relationships]))
+    renderer = RecordingRenderer()
+
+    MindmapGenerator(llm=scripted_llm(extract), renderer=renderer).render_mindmap([tuple(rel) for rel in stored])
+
+    assert ("Transformers", "use", "Attention") in renderer.relationships
+    assert renderer.weights[("Transformers", "use", "Attention")] == 2
+    assert renderer.weights[("Transformers", "uses", "Attention")] == 1
+
+class SynonymEmbedding:
+    """An embedding function giving the names in `synonyms` one shared vector and every other name its own."""
+
+    def __init__(self, synonyms: set):
+        self.synonyms = synonyms
+        self.vectors = {}
+
+    def encode(self, texts: list) -> np.ndarray:
+        rows = []
+        for text in texts:
+            name = "synonyms" if text in self.synonyms else text
+            if name not in self.vectors:
+                self.vectors[name] = np.eye(16, dtype=np.float32)[len(self.vectors)]
+            rows.append(self.vectors[name])
+        return np.array(rows)
+
+CONTRASTING_PAIRS = [
+    ("Supervised Learning", "Unsupervised Learning"),
+    ("self-supervised learning", "semi-supervised learning"),
+    ("LLaMA 2 70B", "LLaMA 3 70B"),
+    ("convex optimization", "non-convex optimization"),
+]
+
+@pytest.mark.parametrize("with_embeddings", [False, True])
+@pytest.mark.parametrize("first, second", CONTRASTING_PAIRS)
+def test_contrasting_concepts_stay_separate(first, second, with_embeddings):
+    # With embeddings, the pair is as similar as it can get; only the name rules keep it apart
+    embedding_function = SynonymEmbedding({first, second}) if with_embeddings else None
+    generator = MindmapGenerator(llm=FakeLLM(), embedding_function=embedding_function)
+
+    merged = generator.merge_relationships([[(first, "differs from", second)], [(second, "uses", "Data")]])
+
+    assert (first, "differs from", second, 1) in merged
+    assert (second, "uses", "Data", 1) in merged
+
+def test_spelling_variants_are_merged():
+    generator = MindmapGenerator(llm=FakeLLM())
+    variants = ["Graph Neural Networks", "graph-neural network", "graph neural networks.", "Graph Neural Networks"]
+
+    merged = generator.merge_relationships([[(variant, "model", "Molecules")] for variant in variants])
+
+    assert merged == [("Graph Neural Networks", "model", "Molecules", 4)]
+    assert concept_key("Pre-trained Transformers") == concept_key("pretrained transformer")
+    assert concept_key("LLaMA 2 70B") != concept_key("LLaMA 270B")
+
+def test_synonyms_are_merged_with_embeddings():
+    generator = MindmapGenerator(llm=FakeLLM(), embedding_function=SynonymEmbedding({"GNN", "Graph Neural Networks"}))
+
+    merged = generator.merge_relationships([[("GNN", "model", "Molecules")], [("Graph Neural Networks", "model", "Molecules")]])
+
+    assert [weight for *_, weight in merged] == [2]
+
+def test_refine_weights_are_not_given_to_contrasting_concepts():
+    embedding_function = SynonymEmbedding({"Supervised Learning", "Unsupervised Learning"})
+    generator = MindmapGenerator(llm=FakeLLM(), embedding_function=embedding_function)
+    weighted = [("Supervised Learning", "needs", "Labels", 5)]
+
+    carried = generator.carry_weights([("Unsupervised Learning", "needs", "Labels", 1)], weighted)
+
+    assert carried == [("Unsupervised Learning", "needs", "Labels", 1)]
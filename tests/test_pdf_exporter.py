@@ -0,0 +1,91 @@
+import fitz
+import pytest
+
+from benchmarks.fakes import FakeLLM
+from tools.pdf_exporter import PDFExporter
+from tools.research_brief import ResearchBrief
+
+def make_brief(num_papers: int, summary_words: int = 60) -> ResearchBrief:
+    """Builds a brief whose papers have unique titles and summaries of distinct words."""
+    papers = [
+        {'title': f"Paper {i} on graph learning", 'authors': f"Author {i}", 'url': f"http://arxiv.org/abs/2401.{i:05d}v1"}
+        for i in range(num_papers)
+    ]
+    summaries = {paper['title']: " ".join(f"p{i}w{j}" for j in range(summary_words)) for i, paper in enumerate(papers)}
+    mindmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 400, 200), 0)
+    mindmap.clear_with(200)
+    return ResearchBrief(
+        topic="graph learning",
+        papers=papers,
+        summaries=summaries,
+        executive_summary=" ".join(f"exec{j}" for j in range(400)),
+        mindmap_image=mindmap.tobytes("png")
+    )
+
+def words(doc: fitz.Document) -> list:
+    return " ".join(page.get_text() for page in doc).split()
+
+def contains_run(haystack: list, needle: list) -> bool:
+    """Tells whether `needle` appears as a contiguous run of `haystack`."""
+    return any(haystack[i:i + len(needle)] == needle for i in range(len(haystack) - len(needle) + 1))
+
+@pytest.fixture
+def exporter():
+    return PDFExporter(llm=FakeLLM(), contents_min_papers=10)
+
+def test_all_summary_text_is_rendered(exporter):
+    brief = make_brief(6, summary_words=400)
+
+    doc = fitz.open("pdf", exporter.render_pdf(brief))
+
+    text = words(doc)
+    assert contains_run(text, brief.executive_summary.split())
+    for summary in brief.summaries.values():
+        assert contains_run(text, summary.split())
+
+def test_bookmarks_point_at_each_section_and_paper(exporter):
+    brief = make_brief(6, summary_words=400)
+
+    doc = fitz.open("pdf", exporter.render_pdf(brief))
+
+    toc = doc.get_toc()
+    expected = ["Executive Summary", "Concept Mind Map", "Detailed Summaries & Sources"]
+    assert [(level, title) for level, title, _ in toc] == (
+        [(1, title) for title in expected] + [(2, paper['title']) for paper in brief.papers]
+    )
+    for _, title, page in toc:
+        assert title in doc[page - 1].get_text()
+    assert len(doc) > 2
+
+def test_contents_spanning_pages_is_numbered_correctly(exporter):
+    # Enough papers that the printed contents list needs more than one page
+    brief = make_brief(120, summary_words=40)
+
+    doc = fitz.open("pdf", exporter.render_pdf(brief))
+
+    toc = doc.get_toc()
+    first_body_page = toc[0][2]
+    assert first_body_page > 2
+    contents_links = [link for page in doc.pages(0, first_body_page - 1) for link in page.get_links()
+                      if link['kind'] == fitz.LINK_GOTO]
+    assert [link['page'] + 1 for link in contents_links] == [page for _, _, page in toc]
+    # Each printed entry is its title followed by its page number
+    lines = [line for page in doc.pages(0, first_body_page - 1) for line in page.get_text().splitlines()]
+    printed = lines[lines.index("Contents") + 1:]
+    assert list(zip(printed[::2], printed[1::2])) == [(title, str(page)) for _, title, page in toc]
+    for _, title, page in toc:
+        assert title in doc[page - 1].get_text()
+
+def test_rendering_makes_no_llm_calls(scripted_llm, tmp_path):
+    def no_calls(prompt):
+        raise AssertionError("the exporter called the LLM while rendering")
+    exporter = PDFExporter(llm=scripted_llm(no_calls))
+    brief = make_brief(3)
+
+    pdf = exporter.render_pdf(brief)
+    exporter.export_to_pdf(brief, str(tmp_path / "brief.pdf"))
+
+    assert pdf.startswith(b"%PDF")
+    assert (tmp_path / "brief.pdf").read_bytes().startswith(b"%PDF")
+    with pytest.raises(AssertionError, match="called the LLM"):
+        exporter.generate_executive_summary(list(brief.summaries.values()))
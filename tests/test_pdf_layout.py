@@ -0,0 +1,46 @@
+import fitz
+
+from tools.pdf_layout import FlowLayout, text_length
+
+def test_pages_needed_counts_from_the_cursor():
+    layout = FlowLayout(fitz.open())
+    per_page = int((layout.bottom - layout.margin) // 10)
+
+    assert layout.pages_needed(per_page, 10) == 1
+    assert layout.pages_needed(per_page + 1, 10) == 2
+    layout.space(10 * (per_page - 1))
+    assert layout.pages_needed(1, 10) == 1
+    assert layout.pages_needed(2, 10) == 2
+    assert layout.pages_needed(per_page + 2, 10) == 3
+
+def test_text_flows_onto_new_pages():
+    doc = fitz.open()
+    layout = FlowLayout(doc)
+    words = [f"word{i}" for i in range(3000)]
+
+    start = layout.text(" ".join(words), fontsize=11)
+    layout.finish()
+
+    assert start == (0, layout.margin)
+    assert len(doc) > 1
+    assert " ".join(page.get_text() for page in doc).split() == words
+
+def test_contents_line_links_to_target_and_shortens_long_titles():
+    doc = fitz.open()
+    for _ in range(3):
+        doc.new_page()
+    layout = FlowLayout(doc)
+    long_title = "A very long paper title " * 10
+
+    layout.contents_line("Executive Summary", 1, 120)
+    layout.contents_line(long_title, 2, 300, indent=14)
+    layout.finish()
+
+    lines = doc[0].get_text().splitlines()
+    assert lines[:2] == ["Executive Summary", "2"]
+    assert lines[2].endswith("...") and long_title.startswith(lines[2][:-3])
+    assert text_length(lines[2], 11) <= layout.width - 14
+    assert lines[3] == "3"
+    # Links are only listed once the document is saved
+    links = fitz.open("pdf", doc.tobytes())[0].get_links()
+    assert [(link['page'], round(link['to'].y)) for link in links] == [(1, 120), (2, 300)]
@@ -0,0 +1,39 @@
+import socket
+
+import resources
+from benchmarks.fakes import HashingEmbeddingModel
+from tools.metrics import metrics
+from vector_store.embeddings import CachedSentenceTransformerEmbedding
+from vector_store.vector_manager import VectorManager
+
+def test_vector_managers_share_indexes_and_sync_once(tmp_path, monkeypatch):
+    embedding_function = CachedSentenceTransformerEmbedding(HashingEmbeddingModel(dim=32))
+    monkeypatch.setattr(resources, "get_embedding_function", lambda: embedding_function)
+    syncs = []
+    sync = VectorManager.sync_lexical_index
+    monkeypatch.setattr(VectorManager, "sync_lexical_index", lambda self: syncs.append(self) or sync(self))
+    db_path = str(tmp_path)
+
+    first = resources.create_vector_manager(db_path)
+    second = resources.create_vector_manager(db_path)
+
+    assert first.lexical_index is second.lexical_index
+    assert first.query_log is second.query_log
+    assert len(syncs) == 1
+
+def test_metrics_port_in_use_does_not_stop_startup(monkeypatch, capsys):
+    busy = socket.socket()
+    busy.bind(("127.0.0.1", 0))
+    busy.listen()
+    port = busy.getsockname()[1]
+    monkeypatch.setenv("PAPERPILOT_METRICS_PORT", str(port))
+    monkeypatch.delenv("PAPERPILOT_METRICS_LOG", raising=False)
+    monkeypatch.delitem(resources._resources, ("metrics",), raising=False)
+
+    try:
+        assert resources.init_metrics() is metrics
+    finally:
+        busy.close()
+        resources._resources.pop(("metrics",), None)
+
+    assert f"Could not serve metrics on port {port}" in capsys.readouterr().out
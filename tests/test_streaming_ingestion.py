@@ -0,0 +1,44 @@
+import threading
+
+import pytest
+
+from benchmarks.fakes import SyntheticArxivSource
+from vector_store.arxiv_source import RecordedArxivSource
+
+def test_streaming_stores_recorded_feed(make_manager, arxiv_feeds):
+    manager = make_manager(RecordedArxivSource(arxiv_feeds))
+
+    # Small batches so the duplicate across pages lands in a different batch than the original
+    num_added = manager.stream_and_process_papers("machine learning", max_results=10, batch_size=2, max_pending=2)
+
+    assert num_added == 5
+    assert manager.collection.count() == 5
+    assert len(manager.lexical_index) == 5
+    stored = manager.collection.get(ids=["http://arxiv.org/abs/2312.09999v1"])
+    assert stored['metadatas'][0]['title'] == "LoRA Adapters for Efficient Fine-Tuning"
+    assert stored['metadatas'][0]['year'] == 2023
+    assert manager.last_candidate_ids[:3] == [
+        "http://arxiv.org/abs/2401.00001v1",
+        "http://arxiv.org/abs/2401.00002v1",
+        "http://arxiv.org/abs/2312.09999v1",
+    ]
+
+def test_streaming_rerun_adds_nothing(make_manager, arxiv_feeds):
+    manager = make_manager(RecordedArxivSource(arxiv_feeds))
+    manager.stream_and_process_papers("machine learning", max_results=10)
+
+    assert manager.stream_and_process_papers("machine learning", max_results=10) == 0
+    assert manager.collection.count() == 5
+
+def test_streaming_write_failure_stops_producer(make_manager, monkeypatch):
+    manager = make_manager(SyntheticArxivSource(page_size=10))
+
+    def fail(results, query, timings):
+        raise RuntimeError("disk full")
+    monkeypatch.setattr(manager, "_store_results", fail)
+
+    # The queue fills up long before the producer runs out of results
+    with pytest.raises(RuntimeError, match="disk full"):
+        manager.stream_and_process_papers("quantum computing", max_results=1000, batch_size=1, max_pending=1)
+
+    assert not any(thread.name == "arxiv-fetch" for thread in threading.enumerate())
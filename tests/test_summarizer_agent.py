@@ -0,0 +1,75 @@
+import re
+import time
+
+import pytest
+
+from agents.summarizer_agent import SummarizerAgent
+from tools.llm_cache import LLMCache
+
+def summarize(prompt: str) -> str:
+    """Answers after the delay named in the abstract ('paper <n> delay <seconds>'); abstracts containing FAIL raise."""
+    paper, delay = re.search(r"paper (\d+) delay ([\d.]+)", prompt).groups()
+    time.sleep(float(delay))
+    if "FAIL" in prompt:
+        raise RuntimeError("model crashed")
+    return f"summary of paper {paper}"
+
+@pytest.fixture
+def agent(scripted_llm):
+    return SummarizerAgent(llm=scripted_llm(summarize))
+
+def test_summarize_many_keeps_input_order(agent):
+    # Later abstracts finish first
+    abstracts = [f"paper {i} delay {0.1 * (4 - i):.1f}" for i in range(5)]
+
+    summaries = agent.summarize_many(abstracts, max_concurrency=5)
+
+    assert summaries == [f"summary of paper {i}" for i in range(5)]
+
+def test_summarize_many_isolates_failures(agent):
+    abstracts = ["paper 0 delay 0.0", "paper 1 delay 0.0 FAIL", "paper 2 delay 0.0", ""]
+
+    summaries = agent.summarize_many(abstracts, max_concurrency=4)
+
+    assert summaries == [
+        "summary of paper 0",
+        "Error: Could not generate summary.",
+        "summary of paper 2",
+        "Error: Invalid abstract provided for summarization.",
+    ]
+
+def test_summarize_many_wall_time_is_close_to_slowest_call(agent):
+    abstracts = [f"paper {i} delay 0.3" for i in range(6)]
+
+    start = time.perf_counter()
+    agent.summarize_many(abstracts, max_concurrency=6)
+    elapsed = time.perf_counter() - start
+
+    # Sequential calls would take 1.8s
+    assert elapsed < 0.3 * 2
+
+def test_summarize_many_respects_max_concurrency(agent):
+    abstracts = [f"paper {i} delay 0.2" for i in range(4)]
+
+    start = time.perf_counter()
+    agent.summarize_many(abstracts, max_concurrency=2)
+    elapsed = time.perf_counter() - start
+
+    # Two rounds of two calls
+    assert 0.4 <= elapsed < 0.4 + 0.3
+
+def test_invoke_batch_and_stream_share_the_cache(scripted_llm, tmp_path):
+    prompts = []
+    def counting(prompt):
+        prompts.append(prompt)
+        return summarize(prompt)
+    agent = SummarizerAgent(llm=scripted_llm(counting), cache=LLMCache(str(tmp_path / "cache.db")))
+
+    assert agent.summarize_paper("paper 0 delay 0.0") == "summary of paper 0"
+    assert agent.summarize_many(["paper 0 delay 0.0", "paper 1 delay 0.0"]) == ["summary of paper 0", "summary of paper 1"]
+    assert "".join(agent.stream_summary("paper 1 delay 0.0")) == "summary of paper 1"
+    assert "".join(agent.stream_summary("paper 2 delay 0.0")) == "summary of paper 2"
+    assert agent.summarize_paper("paper 2 delay 0.0") == "summary of paper 2"
+
+    assert len(prompts) == 3
+    assert agent.cache.stats()["hits"] == 3
@@ -0,0 +1,112 @@
+import hashlib
+import os
+import threading
+import time
+
+class ArtifactStore:
+    """A content-addressed on-disk store for rendered artifacts (mind maps, PDFs), shared across sessions."""
+
+    def __init__(self, root: str = "./artifacts", max_bytes: int = 500 * 1024 * 1024, max_age_seconds: int = 7 * 24 * 3600):
+        """
+        Initializes the ArtifactStore.
+
+        Args:
+            root (str): The directory holding the artifacts.
+            max_bytes (int): The total size kept on disk; least recently used artifacts are evicted first.
+            max_age_seconds (int): How long an unused artifact is kept. None disables expiry.
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """
+        Builds a key from the inputs an artifact was rendered from.
+
+        Args:
+            *parts: Strings or bytes that fully determine the artifact.
+
+        Returns:
+            str: A SHA-256 hex digest.
+        """
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def get(self, key: str):
+        """
+        Reads an artifact.
+
+        Args:
+            key (str): The artifact key.
+
+        Returns:
+            bytes: The stored artifact, or None if it is missing.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        # Mark as recently used for eviction
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted since it was read; the data is still valid
+            pass
+        return data
+
+    def put(self, key: str, data: bytes):
+        """
+        Stores an artifact and evicts expired or excess artifacts.
+
+        Args:
+            key (str): The artifact key.
+            data (bytes): The artifact contents.
+        """
+        path = self._path(key)
+        # Write to a temporary file first so concurrent readers never see a partial artifact
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Removes artifacts past their age limit, then the least recently used ones until under the size limit."""
+        # Another process sharing the directory may remove the same files, so missing ones are skipped
+        with self._lock:
+            now = time.time()
+            entries = []
+            for entry in os.scandir(self.root):
+                if not entry.is_file() or entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = entry.stat()
+                    if self.max_age_seconds is not None and now - stat.st_mtime > self.max_age_seconds:
+                        os.remove(entry.path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            if self.max_bytes is None or total <= self.max_bytes:
+                return
+            for _, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                if total <= self.max_bytes:
+                    break
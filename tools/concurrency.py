@@ -0,0 +1,28 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+def map_concurrently(fn, items: list, max_concurrency: int = 4) -> list:
+    """
+    Calls `fn` on every item in worker threads, at most `max_concurrency` at a time.
+
+    LangChain's LLM.batch calls the model one prompt at a time, so each call gets its own thread.
+    Each call runs in a copy of the caller's context so its LLM spans count towards the caller's run.
+    Failures are returned rather than raised, so one failed (or timed out) call doesn't abort the rest.
+
+    Args:
+        fn (callable): The function to call with each item.
+        items (list): The inputs.
+        max_concurrency (int): The maximum number of calls in flight at once.
+
+    Returns:
+        list: The result of each call, or the exception it raised, in the same order as `items`.
+    """
+    def call(item):
+        try:
+            return fn(item)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, call, item) for item in items]
+        return [future.result() for future in futures]
@@ -0,0 +1,177 @@
+import hashlib
+import time
+
+from tools.sqlite_store import SQLiteStore
+
+class LLMCache(SQLiteStore):
+    """A disk-backed, content-addressed cache for LLM outputs."""
+
+    def __init__(self, db_path: str = "./llm_cache.db", ttl_seconds: int = 30 * 24 * 3600, max_entries: int = 10000):
+        """
+        Initializes the LLMCache.
+
+        Args:
+            db_path (str): The path to the SQLite database file.
+            ttl_seconds (int): How long an entry stays valid. None disables expiry.
+            max_entries (int): The maximum number of entries kept; least recently used entries are evicted first.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        super().__init__(db_path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, template: str, text: str) -> str:
+        """
+        Builds the cache key for an LLM call.
+
+        Args:
+            model (str): The name of the model.
+            template (str): The prompt template.
+            text (str): The input text substituted into the template.
+
+        Returns:
+            str: A SHA-256 hex digest identifying the call.
+        """
+        digest = hashlib.sha256()
+        for part in (model, template, text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")  # Separator so ("ab", "c") and ("a", "bc") hash differently
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        """
+        Looks up a cached output.
+
+        Args:
+            key (str): The cache key from `make_key`.
+
+        Returns:
+            str: The cached output, or None if it is missing or expired.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str):
+        """
+        Stores an output and evicts expired or excess entries.
+
+        Args:
+            key (str): The cache key from `make_key`.
+            value (str): The LLM output to store.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            if self.ttl_seconds is not None:
+                self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+            if self.max_entries is not None:
+                self._conn.execute(
+                    """
+                    DELETE FROM llm_cache WHERE key IN (
+                        SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_entries,)
+                )
+            self._conn.commit()
+
+    def get_or_compute(self, model: str, template: str, text: str, compute) -> str:
+        """
+        Returns the cached output for an LLM call, making the call and caching its output on a miss.
+
+        Args:
+            model (str): The name of the model.
+            template (str): The prompt template.
+            text (str): The input text substituted into the template.
+            compute (callable): Makes the LLM call and returns its output. Not called on a hit.
+
+        Returns:
+            str: The cached or freshly computed output.
+        """
+        key = self.make_key(model, template, text)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def stream_or_compute(self, model: str, template: str, text: str, stream):
+        """
+        Streams the output for an LLM call, caching the full text once the stream completes.
+
+        Args:
+            model (str): The name of the model.
+            template (str): The prompt template.
+            text (str): The input text substituted into the template.
+            stream (callable): Starts the LLM call and returns an iterator of output chunks. Not called on a hit.
+
+        Yields:
+            str: The cached output in one piece, or the chunks of a fresh call as they arrive.
+        """
+        key = self.make_key(model, template, text)
+        value = self.get(key)
+        if value is not None:
+            yield value
+            return
+
+        chunks = []
+        for chunk in stream():
+            chunks.append(chunk)
+            yield chunk
+        self.set(key, "".join(chunks))
+
+    def clear(self):
+        """Removes every entry and resets the hit/miss counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Reports how well the cache is performing.
+
+        Returns:
+            dict: The hit and miss counts, hit rate and current number of entries.
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": entries
+            }
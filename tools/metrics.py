@@ -0,0 +1,262 @@
+import contextvars
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger("paperpilot.metrics")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Span records of the run being executed in the current context (see MetricsRegistry.collect_run)
+_current_run = contextvars.ContextVar("paperpilot_current_run", default=None)
+
+class Span:
+    """A timed operation; `duration` is set when the span ends."""
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+        self.start = time.time()
+        self.duration = 0.0
+        self.error = None
+
+    def set(self, **attrs):
+        """Adds attributes discovered while the span is running (e.g. result counts)."""
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> dict:
+        record = {'span': self.name, 'start': self.start, 'duration': round(self.duration, 6), **self.attrs}
+        if self.error:
+            record['error'] = self.error
+        return record
+
+class MetricsRegistry:
+    """Collects timing histograms and counters for the brief pipeline and emits them as structured logs."""
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        """
+        Initializes the MetricsRegistry.
+
+        Args:
+            buckets (tuple): Upper bounds, in seconds, of the latency histogram buckets.
+        """
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms = defaultdict(lambda: {'count': 0, 'sum': 0.0, 'errors': 0, 'buckets': [0] * len(self.buckets)})
+        self._counters = defaultdict(float)
+        self._server = None
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """
+        Times a block of code.
+
+        Args:
+            name (str): The operation name, e.g. 'chroma_query'.
+            **attrs: Extra fields for the structured log record.
+
+        Yields:
+            Span: The running span; its `duration` is available after the block.
+        """
+        span = Span(name, dict(attrs))
+        start = time.perf_counter()
+        try:
+            yield span
+        except Exception as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.duration = time.perf_counter() - start
+            self._record(span)
+
+    def observe(self, name: str, duration: float, error: str = None, **attrs):
+        """Records an operation that was timed elsewhere."""
+        span = Span(name, dict(attrs))
+        span.start -= duration
+        span.duration = duration
+        span.error = error
+        self._record(span)
+
+    def increment(self, name: str, value: float = 1.0):
+        """Adds to a counter, e.g. 'llm_completion_tokens'."""
+        with self._lock:
+            self._counters[name] += value
+
+    def _record(self, span: Span):
+        with self._lock:
+            histogram = self._histograms[span.name]
+            histogram['count'] += 1
+            histogram['sum'] += span.duration
+            for i, bound in enumerate(self.buckets):
+                if span.duration <= bound:
+                    histogram['buckets'][i] += 1
+            if span.error:
+                histogram['errors'] += 1
+
+        run = _current_run.get()
+        if run is not None:
+            run.append(span.to_dict())
+        logger.info(json.dumps(span.to_dict(), default=str))
+
+    @contextmanager
+    def collect_run(self):
+        """
+        Collects every span recorded in this context (and in threads started with a copy of it).
+
+        Yields:
+            list: The span records, filled in as the run progresses.
+        """
+        spans = []
+        token = _current_run.set(spans)
+        try:
+            yield spans
+        finally:
+            _current_run.reset(token)
+
+    def prometheus_text(self) -> str:
+        """Renders all histograms and counters in the Prometheus text exposition format."""
+        lines = [
+            "# HELP paperpilot_span_seconds Duration of instrumented pipeline operations.",
+            "# TYPE paperpilot_span_seconds histogram",
+        ]
+        with self._lock:
+            for name, histogram in sorted(self._histograms.items()):
+                # Bucket counts are already cumulative: each observation lands in every bucket it fits
+                for bound, count in zip(self.buckets, histogram['buckets']):
+                    lines.append(f'paperpilot_span_seconds_bucket{{span="{name}",le="{bound}"}} {count}')
+                lines.append(f'paperpilot_span_seconds_bucket{{span="{name}",le="+Inf"}} {histogram["count"]}')
+                lines.append(f'paperpilot_span_seconds_sum{{span="{name}"}} {histogram["sum"]:.6f}')
+                lines.append(f'paperpilot_span_seconds_count{{span="{name}"}} {histogram["count"]}')
+            lines.append("# TYPE paperpilot_span_errors_total counter")
+            for name, histogram in sorted(self._histograms.items()):
+                lines.append(f'paperpilot_span_errors_total{{span="{name}"}} {histogram["errors"]}')
+            for name, value in sorted(self._counters.items()):
+                lines.append(f"# TYPE paperpilot_{name}_total counter")
+                lines.append(f"paperpilot_{name}_total {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def start_server(self, port: int = 9464, host: str = "127.0.0.1"):
+        """
+        Serves `/metrics` for a Prometheus scraper from a background thread. Calling it again is a no-op.
+
+        Args:
+            port (int): The port to listen on.
+            host (str): The interface to bind; local-only by default.
+        """
+        with self._lock:
+            if self._server is not None:
+                return
+            registry = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.rstrip("/") != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = registry.prometheus_text().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass  # Scrapes would otherwise flood stderr
+
+            self._server = ThreadingHTTPServer((host, port), Handler)
+            threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+
+def summarize_spans(spans: list) -> list:
+    """
+    Aggregates a run's span records for display.
+
+    Args:
+        spans (list): Records from `collect_run`.
+
+    Returns:
+        list: One dict per span name with call count, total and max seconds, and LLM token rates where known.
+    """
+    rows = {}
+    for record in spans:
+        row = rows.setdefault(record['span'], {'span': record['span'], 'calls': 0, 'total_s': 0.0, 'max_s': 0.0, 'errors': 0})
+        row['calls'] += 1
+        row['total_s'] += record['duration']
+        row['max_s'] = max(row['max_s'], record['duration'])
+        row['errors'] += 1 if record.get('error') else 0
+        if 'completion_tokens' in record:
+            row['completion_tokens'] = row.get('completion_tokens', 0) + record['completion_tokens']
+            row['prompt_tokens'] = row.get('prompt_tokens', 0) + record.get('prompt_tokens', 0)
+    for row in rows.values():
+        if row.get('completion_tokens') and row['total_s']:
+            row['tokens_per_s'] = round(row['completion_tokens'] / row['total_s'], 1)
+        row['total_s'] = round(row['total_s'], 3)
+        row['max_s'] = round(row['max_s'], 3)
+    return sorted(rows.values(), key=lambda row: row['total_s'], reverse=True)
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """A LangChain callback that records each LLM call as an 'llm.<name>' span with token counts."""
+
+    def __init__(self, name: str, registry: MetricsRegistry = None):
+        """
+        Initializes the callback.
+
+        Args:
+            name (str): Identifies the calling chain, e.g. 'summarize'.
+            registry (MetricsRegistry): Where spans are recorded; defaults to the process-wide `metrics`.
+        """
+        self.name = name
+        self.registry = registry or metrics
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        with self._lock:
+            self._calls[run_id] = {'start': time.perf_counter(), 'first_token': None, 'prompt': "".join(prompts)}
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        with self._lock:
+            call = self._calls.get(run_id)
+            if call is not None and call['first_token'] is None:
+                call['first_token'] = time.perf_counter() - call['start']
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            call = self._calls.pop(run_id, None)
+        if call is None:
+            return
+        duration = time.perf_counter() - call['start']
+        generations = [g for batch in response.generations for g in batch]
+        text = "".join(g.text for g in generations)
+        info = {}
+        for generation in generations:
+            info.update(generation.generation_info or {})
+
+        # Ollama reports exact counts; otherwise fall back to a ~4 characters per token estimate
+        prompt_tokens = info.get('prompt_eval_count') or max(1, len(call['prompt']) // 4)
+        completion_tokens = info.get('eval_count') or max(1, len(text) // 4)
+        attrs = {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'tokens_per_s': round(completion_tokens / duration, 1) if duration else None,
+        }
+        if call['first_token'] is not None:
+            attrs['time_to_first_token'] = round(call['first_token'], 4)
+        self.registry.observe(f"llm.{self.name}", duration, **attrs)
+        self.registry.increment("llm_prompt_tokens", prompt_tokens)
+        self.registry.increment("llm_completion_tokens", completion_tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            call = self._calls.pop(run_id, None)
+        duration = time.perf_counter() - call['start'] if call else 0.0
+        # Agents turn failures into error strings, so this is where they become visible
+        self.registry.observe(f"llm.{self.name}", duration, error=f"{type(error).__name__}: {error}")
+
+# Process-wide registry used by the pipeline components
+metrics = MetricsRegistry()
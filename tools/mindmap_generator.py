@@ -1,20 +1,110 @@
+from collections import Counter, defaultdict
+
 from langchain_community.llms import Ollama
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-import networkx as nx
-import matplotlib.pyplot as plt
 import re
 
+from tools.concurrency import map_concurrently
+from tools.metrics import LLMMetricsCallback
+from tools.mindmap_renderer import MindmapRenderer
+
+def normalize_concept(name: str) -> str:
+    """Normalizes a relationship name for comparison: lowercase, single spaces, no surrounding punctuation."""
+    return " ".join(name.lower().split()).strip(" .,;:'\"")
+
+CONCEPT_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# Prefixes that make a different concept ('supervised' vs 'unsupervised'), so names differing by one are never merged
+CONTRASTING_PREFIXES = ("cross", "multi", "anti", "post", "semi", "self", "non", "pre", "sub", "dis", "un", "de", "co")
+
+def _singular(token: str) -> str:
+    """Strips a regular English plural ending ('networks' -> 'network', 'approaches' -> 'approach')."""
+    if len(token) <= 3 or not token.endswith("s") or token.endswith(("ss", "us", "is")):
+        return token
+    if token.endswith("ies"):
+        return token[:-3] + "y"
+    if token.endswith(("sses", "ches", "shes", "xes")):
+        return token[:-2]
+    return token[:-1]
+
+def concept_tokens(name: str) -> list:
+    """Splits a concept name into lowercase, singular word tokens, dropping punctuation and hyphens."""
+    return [_singular(token) for token in CONCEPT_TOKEN_PATTERN.findall(name.lower())]
+
+def concept_key(name: str) -> str:
+    """
+    Reduces a concept name to what its spelling variants share.
+
+    Case, punctuation, hyphenation and regular plurals are ignored, so 'Pre-trained
+    Transformers' and 'pretrained transformer' get the same key. Numbers stay separate
+    tokens, so 'LLaMA 2 70B' and 'LLaMA 270B' do not.
+    """
+    joined = "".join(f" {token} " if token.isdigit() else token for token in concept_tokens(name))
+    return " ".join(joined.split())
+
+def _split_prefix(token: str) -> tuple:
+    for prefix in CONTRASTING_PREFIXES:
+        if token.startswith(prefix):
+            return prefix, token[len(prefix):]
+    return "", token
+
+def contrasting_concepts(a: str, b: str) -> bool:
+    """
+    Tells whether two concept names denote different things however alike they look.
+
+    They do if they contain different numbers ('LLaMA 2 70B' vs 'LLaMA 3 70B') or differ
+    by a contrasting prefix ('supervised' vs 'unsupervised', 'self-supervised' vs 'semi-supervised').
+    """
+    if concept_key(a) == concept_key(b):
+        return False
+    if re.findall(r"\d+", a) != re.findall(r"\d+", b):
+        return True
+    tokens_a, tokens_b = set(concept_tokens(a)), set(concept_tokens(b))
+    only_a, only_b = tokens_a - tokens_b, tokens_b - tokens_a
+    if any(token in CONTRASTING_PREFIXES for token in only_a | only_b):
+        return True
+    for token_a in only_a:
+        prefix_a, stem_a = _split_prefix(token_a)
+        for token_b in only_b:
+            prefix_b, stem_b = _split_prefix(token_b)
+            if prefix_a != prefix_b and (stem_a == stem_b or stem_a == token_b or token_a == stem_b):
+                return True
+    return False
+
+def split_weights(relationships: list) -> tuple:
+    """Splits (source, relation, target[, weight]) tuples into plain triples and a weight per triple."""
+    triples, weights = [], {}
+    for relationship in relationships:
+        triple = tuple(relationship[:3])
+        triples.append(triple)
+        if len(relationship) > 3:
+            weights[triple] = relationship[3]
+    return triples, weights
+
 class MindmapGenerator:
     """Generates a mind map from a collection of research paper texts."""
 
-    def __init__(self, model: str = "mistral"):
+    def __init__(self, model: str = "mistral", llm=None, cache=None, similarity_threshold: float = 0.9, renderer=None,
+                 embedding_function=None):
         """
         Initializes the MindmapGenerator.
 
         Args:
             model (str): The name of the Ollama model to use.
+            llm: Optional pre-built LangChain LLM to use instead of creating an Ollama client.
+            cache (LLMCache): Optional cache consulted before invoking the LLM.
+            similarity_threshold (float): The cosine similarity two concept names' embeddings need to be
+                merged into one node; only used with `embedding_function`.
+            renderer (MindmapRenderer): Optional renderer with a custom node/edge budget.
+            embedding_function (CachedSentenceTransformerEmbedding): Optional embedding model for merging
+                synonymous concept names. Without it only spelling variants are merged.
         """
+        self.renderer = renderer if renderer is not None else MindmapRenderer()
+        self.model = model
+        self.cache = cache
+        self.similarity_threshold = similarity_threshold
+        self.embedding_function = embedding_function
+
         # Prompt to extract relationships from text
         template = """
         Based on the following collection of research paper abstracts, extract the key concepts and their relationships.
@@ -28,12 +118,47 @@ class MindmapGenerator:
 
         EXTRACTED RELATIONSHIPS:
         """
+        self.template = template
         prompt = PromptTemplate(
             template=template,
             input_variables=["abstracts"]
         )
-        llm = Ollama(model=model)
-        self.chain = prompt | llm | StrOutputParser()
+
+        # Map step: relationships from a single abstract
+        self.map_template = """
+        Based on the following research paper abstract, extract the key concepts and their relationships.
+        Present these relationships in a simple format, one per line, like this:
+        (Concept A) -> [RELATIONSHIP] -> (Concept B)
+
+        Use short, general concept names.
+
+        ABSTRACT:
+        {abstracts}
+
+        EXTRACTED RELATIONSHIPS:
+        """
+        map_prompt = PromptTemplate(template=self.map_template, input_variables=["abstracts"])
+
+        # Optional reduce step: consolidate the merged graph
+        self.reduce_template = """
+        The following concept relationships were extracted from several research papers on one topic.
+        The number in braces is how many papers support each relationship.
+        Consolidate them into the most important and central relationships: merge synonyms and drop minor details.
+        Present the result in the same format, one per line, like this:
+        (Concept A) -> [RELATIONSHIP] -> (Concept B)
+
+        RELATIONSHIPS:
+        {abstracts}
+
+        CONSOLIDATED RELATIONSHIPS:
+        """
+        reduce_prompt = PromptTemplate(template=self.reduce_template, input_variables=["abstracts"])
+
+        if llm is None:
+            llm = Ollama(model=model)
+        self.chain = (prompt | llm | StrOutputParser()).with_config(callbacks=[LLMMetricsCallback("relations")])
+        self.map_chain = (map_prompt | llm | StrOutputParser()).with_config(callbacks=[LLMMetricsCallback("relations_map")])
+        self.reduce_chain = (reduce_prompt | llm | StrOutputParser()).with_config(callbacks=[LLMMetricsCallback("relations_reduce")])
 
     def _parse_relationships(self, text_blob: str) -> list:
         """Parses the LLM output to extract relationship tuples."""
@@ -44,65 +169,239 @@ class MindmapGenerator:
         # Clean up whitespace for each part of the tuple
         return [(a.strip(), b.strip(), c.strip()) for a, b, c in matches]
 
-    def generate_mindmap_data(self, abstracts: list) -> list:
+    def _invoke_cached(self, chain, template: str, text: str) -> str:
+        """Invokes a chain, reusing a cached response for the same model, prompt and input if one exists."""
+        invoke = lambda: chain.invoke({"abstracts": text})
+        if self.cache is None:
+            return invoke()
+        return self.cache.get_or_compute(self.model, template, text, invoke)
+
+    def generate_mindmap_data(self, abstracts: list, map_reduce: bool = True, max_concurrency: int = 4, refine: bool = False) -> list:
         """
         Uses the LLM to generate relationship data from abstracts.
 
+        In map-reduce mode each abstract is processed by its own (cacheable) LLM call, run in
+        parallel, and the results are merged locally, so latency depends on concurrency rather
+        than on the combined length of all abstracts. Otherwise all abstracts go into one prompt.
+
         Args:
             abstracts (list): A list of paper abstract strings.
+            map_reduce (bool): Extract per abstract and merge locally instead of using one large prompt.
+            max_concurrency (int): The maximum number of extraction calls in flight at once.
+            refine (bool): In map-reduce mode, run one extra LLM pass over the merged relationships.
 
         Returns:
-            list: A list of tuples, where each tuple is a relationship.
+            list: (source, relation, target, weight) tuples, where the weight is the number of
+                extractions supporting the relationship (always 1 without map-reduce).
         """
+        abstracts = [abstract for abstract in abstracts if abstract]
         if not abstracts:
             return []
-        
-        # Join all abstracts into a single string
-        full_text = "\n\n".join(abstracts)
-        
-        # Invoke the LLM chain
-        response = self.chain.invoke({"abstracts": full_text})
-        
-        # Parse the response to get structured data
-        return self._parse_relationships(response)
+
+        if not map_reduce:
+            # Join all abstracts into a single string
+            full_text = "\n\n".join(abstracts)
+            response = self._invoke_cached(self.chain, self.template, full_text)
+            # Parse the response to get structured data
+            return [(a, rel, b, 1) for a, rel, b in self._parse_relationships(response)]
+
+        extractions = self.extract_relationships_many(abstracts, max_concurrency=max_concurrency)
+        weighted = self.merge_relationships(extractions)
+        if refine and weighted:
+            merged_text = "\n".join(f"({a}) -> [{rel}] -> ({b}) {{{weight}}}" for a, rel, b, weight in weighted)
+            refined = self._parse_relationships(self._invoke_cached(self.reduce_chain, self.reduce_template, merged_text))
+            if refined:
+                weighted = self.carry_weights(self.merge_relationships([refined]), weighted)
+        return weighted
+
+    def extract_relationships_many(self, abstracts: list, max_concurrency: int = 4) -> list:
+        """
+        Extracts relationships from each abstract separately and in parallel (the map step).
+
+        Args:
+            abstracts (list): A list of paper abstract strings.
+            max_concurrency (int): The maximum number of LLM calls in flight at once.
+
+        Returns:
+            list: One list of relationship tuples per abstract, in input order. Failed calls yield an empty list.
+        """
+        responses = map_concurrently(lambda abstract: self._invoke_cached(self.map_chain, self.map_template, abstract), abstracts,
+                                     max_concurrency)
+        for i, response in enumerate(responses):
+            if isinstance(response, Exception):
+                print(f"An error occurred during relationship extraction: {response}")
+                responses[i] = ""
+
+        return [self._parse_relationships(response) for response in responses]
+
+    def merge_relationships(self, extractions: list) -> list:
+        """
+        Merges per-abstract relationships into one canonical, weighted set (the reduce step).
+
+        Spelling variants of a concept name (see concept_key) become one node, as do synonyms
+        when an embedding function is set, and each edge is weighted by how many times it was extracted.
+
+        Args:
+            extractions (list): Lists of (source, relation, target) tuples.
+
+        Returns:
+            list: (source, relation, target, weight) tuples, heaviest first.
+        """
+        surface_forms = defaultdict(Counter)
+        for relationships in extractions:
+            for source, relation, target in relationships:
+                for concept in (source, target):
+                    if concept_key(concept):
+                        surface_forms[concept_key(concept)][concept.strip()] += 1
+
+        by_frequency = sorted(surface_forms, key=lambda k: sum(surface_forms[k].values()), reverse=True)
+        canonical = self._group_concepts({key: surface_forms[key].most_common(1)[0][0] for key in by_frequency})
+
+        merged_forms = defaultdict(Counter)
+        for key, representative in canonical.items():
+            merged_forms[representative].update(surface_forms[key])
+        labels = {representative: forms.most_common(1)[0][0] for representative, forms in merged_forms.items()}
+
+        weights = Counter()
+        relation_forms = defaultdict(Counter)
+        for relationships in extractions:
+            for source, relation, target in relationships:
+                source_key = canonical.get(concept_key(source))
+                target_key = canonical.get(concept_key(target))
+                relation_key = normalize_concept(relation)
+                if not source_key or not target_key or source_key == target_key:
+                    continue
+                edge = (source_key, relation_key, target_key)
+                weights[edge] += 1
+                relation_forms[edge][relation.strip()] += 1
+
+        merged = []
+        for edge, weight in weights.most_common():
+            source_key, _, target_key = edge
+            merged.append((labels[source_key], relation_forms[edge].most_common(1)[0][0], labels[target_key], weight))
+        return merged
+
+    def _group_concepts(self, names: dict) -> dict:
+        """
+        Maps each concept key to the key of the node it is merged into.
+
+        A concept merges into a more frequent one when their name embeddings are at least
+        `similarity_threshold` similar and contrasting_concepts does not tell them apart.
+
+        Args:
+            names (dict): A display name per concept key, most frequent concept first.
+
+        Returns:
+            dict: The representative key for every key.
+        """
+        keys = list(names)
+        canonical = {key: key for key in keys}
+        if self.embedding_function is None or len(keys) < 2:
+            return canonical
+
+        similarities = self._name_similarities([names[key] for key in keys], [names[key] for key in keys])
+        representatives = []
+        for i, key in enumerate(keys):
+            for j in representatives:
+                if similarities[i][j] >= self.similarity_threshold and not contrasting_concepts(names[key], names[keys[j]]):
+                    canonical[key] = keys[j]
+                    break
+            else:
+                representatives.append(i)
+        return canonical
+
+    def _name_similarities(self, names: list, others: list):
+        """Returns the cosine similarity of every name to every other name (the embeddings are normalized)."""
+        return self.embedding_function.encode(names) @ self.embedding_function.encode(others).T
+
+    def carry_weights(self, refined: list, weighted: list) -> list:
+        """
+        Weights consolidated relationships by the merged edges they summarize.
+
+        Each refined edge gets the total weight of the merged edges between the same
+        concepts (in either direction, whatever the relation). Concepts match when they
+        are spelling variants or, with an embedding function, synonyms by the same rule
+        as merge_relationships. Edges the LLM introduced without a matching pair keep a weight of 1.
+
+        Args:
+            refined (list): (source, relation, target, weight) tuples from the refine pass.
+            weighted (list): (source, relation, target, weight) tuples from merge_relationships.
+
+        Returns:
+            list: The refined tuples with carried-over weights, heaviest first.
+        """
+        support = Counter()
+        names = {}
+        for source, _, target, weight in weighted:
+            support[(concept_key(source), concept_key(target))] += weight
+            names.setdefault(concept_key(source), source)
+            names.setdefault(concept_key(target), target)
+
+        unmatched = sorted({
+            concept for source, _, target, _ in refined for concept in (source, target)
+            if concept_key(concept) not in names
+        })
+        synonyms = {}
+        if unmatched and names and self.embedding_function is not None:
+            keys = list(names)
+            similarities = self._name_similarities(unmatched, [names[key] for key in keys])
+            for concept, row in zip(unmatched, similarities):
+                candidates = [
+                    (similarity, key) for similarity, key in zip(row, keys)
+                    if similarity >= self.similarity_threshold and not contrasting_concepts(concept, names[key])
+                ]
+                if candidates:
+                    synonyms[concept] = max(candidates)[1]
+
+        def match(concept: str) -> str:
+            key = concept_key(concept)
+            return key if key in names else synonyms.get(concept)
+
+        carried = []
+        for source, relation, target, _ in refined:
+            pair = (match(source), match(target))
+            weight = support.get(pair) or support.get(pair[::-1]) or 1
+            carried.append((source, relation, target, weight))
+        return sorted(carried, key=lambda edge: edge[3], reverse=True)
+
+    def render_mindmap(self, relationships: list, fmt: str = "png", layout: str = "auto") -> bytes:
+        """
+        Renders a mind map to in-memory image bytes.
+
+        Args:
+            relationships (list): (source, relation, target, weight) tuples as returned by
+                generate_mindmap_data; (source, relation, target) tuples count as weight 1.
+            fmt (str): The output format, 'png' or 'svg'.
+            layout (str): The layout method; 'auto' picks a fast layout for large graphs.
+
+        Returns:
+            bytes: The encoded image, or None if there is nothing to draw.
+        """
+        triples, weights = split_weights(relationships)
+        return self.renderer.render(triples, weights=weights, fmt=fmt, layout=layout)
 
     def create_mindmap_image(self, relationships: list, output_path: str = "mindmap.png"):
         """
         Creates and saves a mind map image from relationship data.
 
         Args:
-            relationships (list): A list of relationship tuples.
+            relationships (list): Relationship tuples, optionally weighted (see render_mindmap).
             output_path (str): The path to save the output image.
+
+        Returns:
+            str: The path of the saved image, or None if no image was created.
         """
         if not relationships:
             print("No relationships found to generate a mind map.")
-            return
-
-        G = nx.DiGraph()
-
-        # Add nodes and edges from the relationships
-        for source, relation, target in relationships:
-            G.add_node(source, label=source)
-            G.add_node(target, label=target)
-            G.add_edge(source, target, label=relation)
-
-        plt.figure(figsize=(16, 12))
-        
-        # Use a layout that spreads nodes out
-        pos = nx.spring_layout(G, k=3, iterations=50) 
-        
-        nx.draw_networkx_nodes(G, pos, node_size=3000, node_color='skyblue')
-        nx.draw_networkx_labels(G, pos, font_size=10)
-        
-        # Draw edges
-        nx.draw_networkx_edges(G, pos, edgelist=G.edges(), edge_color='gray', arrows=True, arrowstyle='->', arrowsize=20)
-        
-        # Draw edge labels
-        edge_labels = nx.get_edge_attributes(G, 'label')
-        nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, font_color='red', font_size=8)
-        
-        plt.title("Research Concepts Mind Map", size=20)
-        plt.axis('off')
-        plt.savefig(output_path, format="PNG", dpi=300)
-        plt.close()
-        print(f"✅ Mind map saved successfully to {output_path}")
\ No newline at end of file
+            return None
+
+        fmt = "svg" if output_path.lower().endswith(".svg") else "png"
+        image = self.render_mindmap(relationships, fmt=fmt)
+        if image is None:
+            print("No relationships found to generate a mind map.")
+            return None
+
+        with open(output_path, "wb") as f:
+            f.write(image)
+        print(f"✅ Mind map saved successfully to {output_path}")
+        return output_path
@@ -0,0 +1,166 @@
+import io
+
+import networkx as nx
+from matplotlib.figure import Figure
+
+from tools.metrics import metrics
+
+class MindmapRenderer:
+    """Renders concept relationships as a mind map with bounded time and memory."""
+
+    def __init__(self, max_edges: int = 60, max_nodes: int = 40, dpi: int = 150, edge_label_limit: int = 80):
+        """
+        Initializes the MindmapRenderer.
+
+        Args:
+            max_edges (int): The maximum number of edges drawn; the lightest edges are pruned first.
+            max_nodes (int): The maximum number of nodes drawn; the least connected nodes are pruned first.
+            dpi (int): The resolution of raster output.
+            edge_label_limit (int): Edge labels are only drawn for graphs with at most this many edges.
+        """
+        self.max_edges = max_edges
+        self.max_nodes = max_nodes
+        self.dpi = dpi
+        self.edge_label_limit = edge_label_limit
+
+    def build_graph(self, relationships: list, weights: dict = None) -> nx.DiGraph:
+        """
+        Builds the concept graph and prunes it to the node/edge budget.
+
+        Args:
+            relationships (list): (source, relation, target) tuples.
+            weights (dict): Optional weight per relationship tuple; unweighted relationships count as 1.
+
+        Returns:
+            nx.DiGraph: The pruned graph, with 'label' and 'weight' edge attributes.
+        """
+        weights = weights or {}
+        G = nx.DiGraph()
+        for source, relation, target in relationships:
+            weight = weights.get((source, relation, target), 1)
+            if G.has_edge(source, target):
+                # Keep the label of the strongest relation between two concepts, and add up the support
+                edge = G[source][target]
+                if weight > edge['best']:
+                    edge['label'], edge['best'] = relation, weight
+                edge['weight'] += weight
+            else:
+                G.add_edge(source, target, label=relation, weight=weight, best=weight)
+
+        if self.max_edges is not None and G.number_of_edges() > self.max_edges:
+            degree = dict(G.degree())
+            ranked = sorted(
+                G.edges(data='weight'),
+                key=lambda edge: (edge[2], degree[edge[0]] + degree[edge[1]]),
+                reverse=True
+            )
+            G = G.edge_subgraph([(u, v) for u, v, _ in ranked[:self.max_edges]]).copy()
+
+        if self.max_nodes is not None and G.number_of_nodes() > self.max_nodes:
+            strength = dict(G.degree(weight='weight'))
+            keep = sorted(strength, key=strength.get, reverse=True)[:self.max_nodes]
+            G = G.subgraph(keep).copy()
+            G.remove_nodes_from([node for node in list(G) if G.degree(node) == 0])
+
+        return G
+
+    def layout(self, G: nx.DiGraph, method: str = "auto") -> dict:
+        """
+        Computes node positions.
+
+        Args:
+            G (nx.DiGraph): The graph to lay out.
+            method (str): 'spring', 'kamada_kawai', 'circular', or 'auto' to pick by graph size.
+
+        Returns:
+            dict: Node -> (x, y) positions.
+        """
+        n = G.number_of_nodes()
+        if method == "auto":
+            if n <= 50:
+                return nx.spring_layout(G, k=3 / max(n, 1) ** 0.5, iterations=50, seed=42)
+            if n <= 300:
+                # Fewer iterations converge well enough on mid-size graphs
+                return nx.spring_layout(G, iterations=15, seed=42)
+            return nx.circular_layout(G)
+        if method == "spring":
+            return nx.spring_layout(G, k=3 / max(n, 1) ** 0.5, iterations=50, seed=42)
+        if method == "kamada_kawai":
+            return nx.kamada_kawai_layout(G)
+        if method == "circular":
+            return nx.circular_layout(G)
+        raise ValueError(f"Unknown layout method: {method}")
+
+    def render(self, relationships: list, weights: dict = None, fmt: str = "png", layout: str = "auto") -> bytes:
+        """
+        Renders the mind map to an in-memory image.
+
+        Uses the object-oriented Figure API, so no global pyplot state is shared between
+        concurrent renders.
+
+        Args:
+            relationships (list): (source, relation, target) tuples.
+            weights (dict): Optional weight per relationship tuple.
+            fmt (str): The output format, 'png' or 'svg'.
+            layout (str): The layout method (see `layout`).
+
+        Returns:
+            bytes: The encoded image, or None if there is nothing to draw.
+        """
+        G = self.build_graph(relationships, weights)
+        if G.number_of_edges() == 0:
+            return None
+
+        n = G.number_of_nodes()
+        with metrics.span("mindmap_layout", nodes=n, edges=G.number_of_edges(), method=layout):
+            pos = self.layout(G, layout)
+
+        # Scale the canvas and markers with the graph instead of always drawing at poster size
+        scale = min(1.0, max(0.6, n / 40))
+        fig = Figure(figsize=(16 * scale, 12 * scale))
+        ax = fig.subplots()
+        node_size = max(300, int(3000 * min(1.0, 20 / n)))
+
+        max_weight = max(weight for _, _, weight in G.edges(data='weight'))
+        widths = [1 + 2 * weight / max_weight for _, _, weight in G.edges(data='weight')]
+
+        nx.draw_networkx_nodes(G, pos, ax=ax, node_size=node_size, node_color='skyblue')
+        nx.draw_networkx_labels(G, pos, ax=ax, font_size=10 if n <= 40 else 7)
+        nx.draw_networkx_edges(
+            G, pos, ax=ax, edge_color='gray', width=widths, arrows=True,
+            arrowstyle='->', arrowsize=20, node_size=node_size
+        )
+        if G.number_of_edges() <= self.edge_label_limit:
+            edge_labels = nx.get_edge_attributes(G, 'label')
+            nx.draw_networkx_edge_labels(G, pos, ax=ax, edge_labels=edge_labels, font_color='red', font_size=8)
+
+        ax.set_title("Research Concepts Mind Map", size=20)
+        ax.axis('off')
+
+        with metrics.span("mindmap_render", nodes=n, format=fmt) as span:
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=fmt, dpi=self.dpi)
+            span.set(bytes=buffer.tell())
+        return buffer.getvalue()
+
+    def to_dot(self, relationships: list, weights: dict = None) -> str:
+        """
+        Builds Graphviz DOT source for the pruned graph, e.g. for an interactive `st.graphviz_chart`.
+
+        Args:
+            relationships (list): (source, relation, target) tuples.
+            weights (dict): Optional weight per relationship tuple.
+
+        Returns:
+            str: The DOT source.
+        """
+        G = self.build_graph(relationships, weights)
+
+        def quote(text):
+            return '"' + str(text).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+        lines = ["digraph mindmap {", '  node [shape=ellipse, style=filled, fillcolor="skyblue"];']
+        for source, target, data in G.edges(data=True):
+            lines.append(f"  {quote(source)} -> {quote(target)} [label={quote(data['label'])}, penwidth={min(5.0, 1 + data['weight'] / 2):.1f}];")
+        lines.append("}")
+        return "\n".join(lines)
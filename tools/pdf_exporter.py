@@ -1,91 +1,185 @@
 import fitz  # PyMuPDF
-from agents.summarizer_agent import SummarizerAgent
+from langchain_community.llms import Ollama
+from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from tools.metrics import LLMMetricsCallback, metrics
+from tools.pdf_layout import FlowLayout, prepare_image
+from tools.research_brief import ResearchBrief
 
 class PDFExporter:
     """Exports the research brief and mind map to a PDF file."""
 
-    def __init__(self, model: str = "mistral"):
-        self.summarizer = SummarizerAgent(model=model)
+    def __init__(self, model: str = "mistral", llm=None, cache=None, image_dpi: int = 150, image_max_height: float = 360,
+                 contents_min_papers: int = 10):
+        """
+        Initializes the PDFExporter.
 
-    def generate_executive_summary(self, paper_summaries: list) -> str:
-        summaries_text = "\n\n".join(paper_summaries)
-        
-        from langchain_core.prompts import PromptTemplate
-        from langchain_community.llms import Ollama
-        from langchain_core.output_parsers import StrOutputParser
+        Args:
+            model (str): The name of the Ollama model used for the executive summary.
+            llm: Optional pre-built LangChain LLM to use instead of creating an Ollama client.
+            cache (LLMCache): Optional cache consulted before invoking the LLM.
+            image_dpi (int): The resolution the mind map is downsampled to for embedding.
+            image_max_height (float): The maximum height of the mind map on the page, in points.
+            contents_min_papers (int): Briefs with at least this many papers get a printed contents list;
+                all briefs get PDF bookmarks.
+        """
+        self.model = model
+        self.cache = cache
+        self.image_dpi = image_dpi
+        self.image_max_height = image_max_height
+        self.contents_min_papers = contents_min_papers
 
-        template = """
+        # Build the executive summary chain once and reuse it for every brief
+        self.template = """
         You are a senior research analyst. Based on the following summaries of several research papers on a single topic, please synthesize them into a single, high-level executive summary.
         Identify the overarching trends, common methodologies, and any potential research gaps or future directions mentioned. The summary should be concise and accessible to someone familiar with the field.
         INDIVIDUAL SUMMARIES:
         {summaries}
         EXECUTIVE SUMMARY:
         """
-        prompt = PromptTemplate(template=template, input_variables=["summaries"])
-        
-        # FIX: Access the model name from the summarizer's stored attribute
-        llm = Ollama(model=self.summarizer.model)
-        
-        chain = prompt | llm | StrOutputParser()
-        return chain.invoke({"summaries": summaries_text})
-
-    def export_to_pdf(self, research_topic: str, ranked_papers: list, summaries: dict, mindmap_path: str, output_path: str = "Research_Brief.pdf"):
-        doc = fitz.open()
-        page = doc.new_page()
-
-        y_cursor = 50
-        title_font_size = 20
-        heading_font_size = 16
-        body_font_size = 11
-        line_height = 14
-        margin = 50
-        page_width = page.rect.width
-        text_width = page_width - 2 * margin
-
-        page.insert_text((margin, y_cursor), f"Research Brief: {research_topic}", fontsize=title_font_size)
-        y_cursor += 40
-
-        page.insert_text((margin, y_cursor), "Executive Summary", fontsize=heading_font_size)
-        y_cursor += 25
-        paper_summaries_list = [summaries[p['title']] for p in ranked_papers if p['title'] in summaries]
-        executive_summary = self.generate_executive_summary(paper_summaries_list)
-        text_rect = fitz.Rect(margin, y_cursor, page_width - margin, page.rect.height - 50)
-        res = page.insert_textbox(text_rect, executive_summary, fontsize=body_font_size)
-        y_cursor += res + 20
-
-        if y_cursor > page.rect.height - 280:
-            page = doc.new_page()
-            y_cursor = 50
-        page.insert_text((margin, y_cursor), "Concept Mind Map", fontsize=heading_font_size)
-        y_cursor += 25
-        img_rect = fitz.Rect(margin, y_cursor, page_width - margin, y_cursor + 250)
-        page.insert_image(img_rect, filename=mindmap_path)
-        y_cursor += 270
-
-        if y_cursor > page.rect.height - 50:
-            page = doc.new_page()
-            y_cursor = 50
-        page.insert_text((margin, y_cursor), "Detailed Summaries & Sources", fontsize=heading_font_size)
-        y_cursor += 25
-
-        for paper in ranked_papers:
-            if y_cursor > page.rect.height - 150:
-                page = doc.new_page()
-                y_cursor = 50
-            title = paper.get('title', 'N/A')
-            url = paper.get('url', 'N/A')
-            link_rect = fitz.Rect(margin, y_cursor, page_width - margin, y_cursor + line_height)
-            page.insert_link({"kind": fitz.LINK_URI, "uri": url, "from": link_rect})
-            page.insert_text((margin, y_cursor + 11), title, fontsize=body_font_size + 1, color=(0,0,1))
-            y_cursor += line_height * 1.5
-            authors = paper.get('authors', 'N/A')
-            page.insert_text((margin, y_cursor), f"Authors: {authors}", fontsize=body_font_size - 1)
-            y_cursor += line_height
-            summary = summaries.get(title, "Summary not available.")
-            text_rect = fitz.Rect(margin, y_cursor, text_width, 800)
-            res = page.insert_textbox(text_rect, summary, fontsize=body_font_size)
-            y_cursor += res + 20
-
-        doc.save(output_path, garbage=4, deflate=True, clean=True)
+        prompt = PromptTemplate(template=self.template, input_variables=["summaries"])
+        if llm is None:
+            llm = Ollama(model=model)
+        self.chain = (prompt | llm | StrOutputParser()).with_config(callbacks=[LLMMetricsCallback("executive_summary")])
+
+    def generate_executive_summary(self, paper_summaries: list) -> str:
+        """
+        Synthesizes the individual paper summaries into one executive summary.
+
+        Args:
+            paper_summaries (list): A list of paper summary strings.
+
+        Returns:
+            str: The generated executive summary.
+        """
+        summaries_text = "\n\n".join(paper_summaries)
+
+        invoke = lambda: self.chain.invoke({"summaries": summaries_text})
+        if self.cache is None:
+            return invoke()
+        return self.cache.get_or_compute(self.model, self.template, summaries_text, invoke)
+
+    def stream_executive_summary(self, paper_summaries: list):
+        """
+        Streams the executive summary as the LLM produces it.
+
+        Args:
+            paper_summaries (list): A list of paper summary strings.
+
+        Yields:
+            str: Successive chunks of the executive summary.
+        """
+        summaries_text = "\n\n".join(paper_summaries)
+
+        stream = lambda: self.chain.stream({"summaries": summaries_text})
+        if self.cache is None:
+            yield from stream()
+        else:
+            yield from self.cache.stream_or_compute(self.model, self.template, summaries_text, stream)
+
+    def export_to_pdf(self, brief: ResearchBrief, output_path: str = "Research_Brief.pdf"):
+        """
+        Renders a research brief to a PDF file. No LLM calls are made here.
+
+        Args:
+            brief (ResearchBrief): The precomputed brief contents.
+            output_path (str): The path to save the PDF.
+        """
+        doc = self._layout(brief)
+        # Saving straight to the file avoids holding a second, serialized copy of the document in memory
+        with metrics.span("pdf_save", pages=len(doc)):
+            doc.save(output_path, garbage=3, deflate=True)
         doc.close()
-        print(f"✅ Research brief saved successfully to {output_path}")
\ No newline at end of file
+        print(f"✅ Research brief saved successfully to {output_path}")
+
+    def render_pdf(self, brief: ResearchBrief) -> bytes:
+        """
+        Renders a research brief to in-memory PDF bytes. No LLM calls are made here.
+
+        Args:
+            brief (ResearchBrief): The precomputed brief contents.
+
+        Returns:
+            bytes: The PDF document.
+        """
+        doc = self._layout(brief)
+        with metrics.span("pdf_save", pages=len(doc)) as span:
+            pdf_bytes = doc.tobytes(garbage=3, deflate=True)
+            span.set(bytes=len(pdf_bytes))
+        doc.close()
+        return pdf_bytes
+
+    def _layout(self, brief: ResearchBrief) -> fitz.Document:
+        """
+        Lays out a brief: title, contents (for long briefs), executive summary, mind map and per-paper summaries.
+
+        Text is measured and flowed across pages, and every section and paper gets a bookmark.
+
+        Returns:
+            fitz.Document: The laid-out document; the caller saves and closes it.
+        """
+        with metrics.span("pdf_layout", papers=len(brief.papers)) as span:
+            doc = fitz.open()
+            layout = FlowLayout(doc)
+            layout.text(f"Research Brief: {brief.topic}", fontsize=20, fontname="hebo")
+            layout.space(12)
+
+            sections = ["Executive Summary", "Detailed Summaries & Sources"]
+            if brief.mindmap_image:
+                sections.insert(1, "Concept Mind Map")
+
+            print_contents = len(brief.papers) >= self.contents_min_papers
+            if print_contents:
+                layout.text("Contents", fontsize=16, fontname="hebo", keep_lines=2)
+                contents_start = (layout.page_index, layout.y)
+                # Reserve the pages the contents list will fill; it is written once the page numbers are known
+                extra_pages = layout.pages_needed(len(sections) + len(brief.papers), layout.line_height(11)) - 1
+                for _ in range(extra_pages):
+                    layout.new_page()
+                layout.new_page()
+
+            # Bookmark entries: (level, title, page index, y)
+            entries = []
+
+            def heading(title):
+                entries.append((1, title, *layout.text(title, fontsize=16, fontname="hebo", keep_lines=3)))
+                layout.space(4)
+
+            heading("Executive Summary")
+            layout.text(brief.executive_summary or "Not available.", fontsize=11)
+            layout.space(16)
+
+            if brief.mindmap_image:
+                with metrics.span("pdf_image", bytes=len(brief.mindmap_image)):
+                    image, width, height = prepare_image(brief.mindmap_image, layout.width, self.image_max_height, dpi=self.image_dpi)
+                # Keep the heading on the same page as the image
+                layout.ensure_space(layout.line_height(16) + 4 + height)
+                heading("Concept Mind Map")
+                layout.image(image, width, height)
+                layout.space(16)
+
+            heading("Detailed Summaries & Sources")
+            for paper in brief.papers:
+                title = paper.get('title', 'N/A')
+                url = paper.get('url')
+                # Start a paper only if its title, authors and the first summary lines fit on the page
+                layout.ensure_space(layout.line_height(12) + layout.line_height(10) + 2 * layout.line_height(11))
+                start = layout.text(title, fontsize=12, color=(0, 0, 1), uri=url if url and url != 'N/A' else None)
+                entries.append((2, title, *start))
+                layout.text(f"Authors: {paper.get('authors', 'N/A')}", fontsize=10)
+                layout.space(2)
+                layout.text(brief.summaries.get(title, "Summary not available."), fontsize=11)
+                layout.space(14)
+
+            if print_contents:
+                layout.goto(*contents_start)
+                for level, title, page_index, y in entries:
+                    layout.contents_line(title, page_index, y, indent=0 if level == 1 else 14, fontsize=11)
+            layout.finish()
+
+            doc.set_toc([
+                [level, title, page_index + 1, {"kind": fitz.LINK_GOTO, "to": fitz.Point(layout.margin, y)}]
+                for level, title, page_index, y in entries
+            ])
+            span.set(pages=len(doc))
+        return doc
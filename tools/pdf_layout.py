@@ -0,0 +1,267 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import fitz  # PyMuPDF
+
+# Downsampled images keyed by (source digest, target size), shared by all exporters in the process
+_image_cache = OrderedDict()
+_image_cache_lock = threading.Lock()
+IMAGE_CACHE_SIZE = 32
+
+# Advance width of each character at font size 1, per built-in font; the base-14 fonts have no kerning,
+# so a string's width is the sum of its characters' widths
+_char_widths = {}
+
+def text_length(text: str, fontsize: float, fontname: str = "helv") -> float:
+    """Returns the width of a single line of text in points."""
+    widths = _char_widths.setdefault(fontname, {})
+    total = 0.0
+    for char in text:
+        width = widths.get(char)
+        if width is None:
+            width = widths[char] = fitz.get_text_length(char, fontname=fontname, fontsize=1)
+        total += width
+    return total * fontsize
+
+def prepare_image(image: bytes, max_width: float, max_height: float, dpi: int = 150) -> tuple:
+    """
+    Scales an image down to the resolution it is displayed at and strips its alpha channel.
+
+    Args:
+        image (bytes): The encoded source image, e.g. a 300 DPI mind-map PNG.
+        max_width (float): The available width in points.
+        max_height (float): The available height in points.
+        dpi (int): The effective resolution of the embedded image.
+
+    Returns:
+        tuple: (PNG bytes, display width, display height), with the display size in points
+            fitting inside max_width x max_height at the image's aspect ratio.
+    """
+    key = (hashlib.sha256(image).hexdigest(), round(max_width), round(max_height), dpi)
+    with _image_cache_lock:
+        if key in _image_cache:
+            _image_cache.move_to_end(key)
+            return _image_cache[key]
+
+    pix = fitz.Pixmap(image)
+    scale = min(max_width / pix.width, max_height / pix.height)
+    width, height = pix.width * scale, pix.height * scale
+    target_width, target_height = round(width * dpi / 72), round(height * dpi / 72)
+    if target_width < pix.width:
+        pix = fitz.Pixmap(pix, target_width, target_height, None)
+    if pix.alpha:
+        pix = fitz.Pixmap(pix, 0)
+    prepared = (pix.tobytes("png"), width, height)
+
+    with _image_cache_lock:
+        _image_cache[key] = prepared
+        while len(_image_cache) > IMAGE_CACHE_SIZE:
+            _image_cache.popitem(last=False)
+    return prepared
+
+class FlowLayout:
+    """Places wrapped text and images top to bottom, continuing on the next page when a page is full.
+
+    Text is measured with the font metrics and drawn through one Shape per page, which is
+    committed as soon as the layout moves on, so no per-page drawing state is kept around.
+    """
+
+    def __init__(self, doc: fitz.Document, margin: float = 50, line_spacing: float = 1.35):
+        """
+        Initializes the FlowLayout.
+
+        Args:
+            doc (fitz.Document): The document to write into; pages are appended as needed.
+            margin (float): The page margin in points, on all sides.
+            line_spacing (float): Line height as a multiple of the font size.
+        """
+        self.doc = doc
+        self.margin = margin
+        self.line_spacing = line_spacing
+        self.page = None
+        self.page_index = -1
+        self.shape = None
+        self.y = margin
+        self.new_page()
+
+    @property
+    def width(self) -> float:
+        return self.page.rect.width - 2 * self.margin
+
+    @property
+    def bottom(self) -> float:
+        return self.page.rect.height - self.margin
+
+    def new_page(self):
+        """Moves to the top of the next page, reusing pages that already exist (e.g. ones reserved for a contents list)."""
+        self.finish()
+        self.page_index += 1
+        if self.page_index < len(self.doc):
+            self.page = self.doc[self.page_index]
+        else:
+            self.page = self.doc.new_page()
+        self.shape = self.page.new_shape()
+        self.y = self.margin
+
+    def goto(self, page_index: int, y: float):
+        """Moves the cursor to a position on an existing page."""
+        self.finish()
+        self.page_index = page_index - 1
+        self.new_page()
+        self.y = y
+
+    def finish(self):
+        """Commits what was drawn on the current page."""
+        if self.shape is not None:
+            self.shape.commit()
+            self.shape = None
+
+    def line_height(self, fontsize: float) -> float:
+        return fontsize * self.line_spacing
+
+    def ensure_space(self, height: float):
+        """Starts a new page unless `height` points still fit on the current one."""
+        if self.y + height > self.bottom and self.y > self.margin:
+            self.new_page()
+
+    def space(self, height: float):
+        """Adds vertical space, without carrying it over to a new page."""
+        self.y = min(self.y + height, self.bottom)
+
+    def wrap(self, text: str, fontsize: float, fontname: str = "helv", width: float = None) -> list:
+        """
+        Breaks text into lines that fit the given width.
+
+        Args:
+            text (str): The text; newlines start new paragraphs.
+            fontsize (float): The font size.
+            fontname (str): A built-in font name, e.g. 'helv' or 'hebo'.
+            width (float): The line width in points; defaults to the content width.
+
+        Returns:
+            list: The lines, with an empty string for each blank line.
+        """
+        width = self.width if width is None else width
+        space = text_length(" ", fontsize, fontname)
+        lines = []
+        for paragraph in text.split("\n"):
+            line, line_width = [], 0.0
+            for word in paragraph.split():
+                word_width = text_length(word, fontsize, fontname)
+                if word_width > width:
+                    # A single word (e.g. a long URL) wider than the line is broken by character
+                    if line:
+                        lines.append(" ".join(line))
+                        line, line_width = [], 0.0
+                    piece, piece_width = "", 0.0
+                    for char in word:
+                        char_width = text_length(char, fontsize, fontname)
+                        if piece and piece_width + char_width > width:
+                            lines.append(piece)
+                            piece, piece_width = "", 0.0
+                        piece += char
+                        piece_width += char_width
+                    line, line_width = [piece], piece_width
+                    continue
+                needed = word_width + (space if line else 0.0)
+                if line and line_width + needed > width:
+                    lines.append(" ".join(line))
+                    line, line_width = [word], word_width
+                else:
+                    line.append(word)
+                    line_width += needed
+            lines.append(" ".join(line))
+        return lines
+
+    def text(self, text: str, fontsize: float = 11, fontname: str = "helv", color: tuple = (0, 0, 0),
+             uri: str = None, keep_lines: int = 1) -> tuple:
+        """
+        Writes wrapped text at the cursor, flowing onto new pages as needed.
+
+        Args:
+            text (str): The text to write.
+            fontsize (float): The font size.
+            fontname (str): A built-in font name.
+            color (tuple): The RGB text color.
+            uri (str): Optional link target for every written line.
+            keep_lines (int): How many lines must fit on the current page before starting there;
+                use it to keep headings with the text that follows.
+
+        Returns:
+            tuple: (page index, y) where the text starts, e.g. for contents entries.
+        """
+        line_height = self.line_height(fontsize)
+        self.ensure_space(line_height * keep_lines)
+        start = (self.page_index, self.y)
+        lines = self.wrap(text, fontsize, fontname)
+        while lines:
+            if self.y + line_height > self.bottom:
+                self.new_page()
+            # Draw all the lines that fit on this page in one call
+            count = max(1, min(len(lines), int((self.bottom - self.y) // line_height)))
+            run, lines = lines[:count], lines[count:]
+            self.shape.insert_text(
+                (self.margin, self.y + fontsize), run,
+                fontsize=fontsize, fontname=fontname, color=color, lineheight=self.line_spacing
+            )
+            if uri:
+                for i, line in enumerate(run):
+                    top = self.y + i * line_height
+                    rect = fitz.Rect(self.margin, top, self.margin + text_length(line, fontsize, fontname), top + line_height)
+                    self.page.insert_link({"kind": fitz.LINK_URI, "uri": uri, "from": rect})
+            self.y += count * line_height
+        return start
+
+    def pages_needed(self, num_lines: int, line_height: float) -> int:
+        """Returns how many pages, counting the current one, `num_lines` single lines fill from the cursor."""
+        pages, y = 1, self.y
+        for _ in range(num_lines):
+            if y + line_height > self.bottom:
+                pages += 1
+                y = self.margin
+            y += line_height
+        return pages
+
+    def contents_line(self, title: str, target_page: int, target_y: float, indent: float = 0, fontsize: float = 11):
+        """
+        Writes one contents entry: the title, shortened to a single line, and its right-aligned page number,
+        linked to the target position.
+        """
+        line_height = self.line_height(fontsize)
+        if self.y + line_height > self.bottom:
+            self.new_page()
+        number = str(target_page + 1)
+        number_width = text_length(number, fontsize)
+        available = self.width - indent - number_width - 12
+        if text_length(title, fontsize) > available:
+            available -= text_length("...", fontsize)
+            used = 0.0
+            for end, char in enumerate(title):
+                used += text_length(char, fontsize)
+                if used > available:
+                    break
+            title = title[:end].rstrip() + "..."
+        baseline = self.y + fontsize
+        self.shape.insert_text((self.margin + indent, baseline), title, fontsize=fontsize)
+        self.shape.insert_text((self.margin + self.width - number_width, baseline), number, fontsize=fontsize)
+        self.page.insert_link({
+            "kind": fitz.LINK_GOTO,
+            "page": target_page,
+            "to": fitz.Point(self.margin, target_y),
+            "from": fitz.Rect(self.margin, self.y, self.margin + self.width, self.y + line_height)
+        })
+        self.y += line_height
+
+    def image(self, image: bytes, width: float, height: float) -> tuple:
+        """
+        Places an already sized image at the cursor, starting a new page if it does not fit.
+
+        Returns:
+            tuple: (page index, y) where the image starts.
+        """
+        self.ensure_space(height)
+        start = (self.page_index, self.y)
+        self.page.insert_image(fitz.Rect(self.margin, self.y, self.margin + width, self.y + height), stream=image)
+        self.y += height
+        return start
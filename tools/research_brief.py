@@ -0,0 +1,23 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+
+@dataclass
+class ResearchBrief:
+    """All precomputed artifacts needed to render a research brief."""
+
+    topic: str
+    papers: list = field(default_factory=list)  # Ranked paper metadata dictionaries
+    summaries: dict = field(default_factory=dict)  # Paper title -> summary text
+    executive_summary: str = ""
+    mindmap_image: bytes = None  # PNG bytes of the concept mind map, if one was generated
+
+    def fingerprint(self) -> str:
+        """Returns a SHA-256 digest of the brief's contents, usable as an artifact key."""
+        digest = hashlib.sha256(json.dumps(
+            [self.topic, self.papers, self.summaries, self.executive_summary],
+            sort_keys=True,
+            default=str
+        ).encode("utf-8"))
+        digest.update(self.mindmap_image or b"")
+        return digest.hexdigest()
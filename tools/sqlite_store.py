@@ -0,0 +1,18 @@
+import sqlite3
+import threading
+
+class SQLiteStore:
+    """Base class for stores backed by a single SQLite connection."""
+
+    def __init__(self, db_path: str, **connect_kwargs):
+        """
+        Opens the connection.
+
+        The connection is shared across threads, so subclasses must hold `self._lock` while using `self._conn`.
+
+        Args:
+            db_path (str): The path to the SQLite database file.
+            **connect_kwargs: Extra arguments for sqlite3.connect (e.g. timeout, isolation_level).
+        """
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, **connect_kwargs)
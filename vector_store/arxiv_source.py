@@ -0,0 +1,91 @@
+import time
+
+import arxiv
+
+class ArxivSource:
+    """Fetches search results from the live arXiv API, one page at a time."""
+
+    def __init__(self, page_size: int = 100, delay_seconds: float = 3.0, num_retries: int = 3):
+        """
+        Initializes the ArxivSource.
+
+        Args:
+            page_size (int): The number of results requested per API page.
+            delay_seconds (float): The pause between page requests required by the arXiv API terms.
+            num_retries (int): The number of retries for a failed page request.
+        """
+        self.client = arxiv.Client(page_size=page_size, delay_seconds=delay_seconds, num_retries=num_retries)
+
+    def results(self, search_query: str, max_results: int):
+        """
+        Lazily yields results for a query; later pages are only requested as earlier ones are consumed.
+
+        Args:
+            search_query (str): The arXiv query string.
+            max_results (int): The maximum number of results to yield.
+
+        Yields:
+            arxiv.Result: The search results, in relevance order.
+        """
+        search = arxiv.Search(
+            query=search_query,
+            max_results=max_results,
+            sort_by=arxiv.SortCriterion.Relevance
+        )
+        yield from self.client.results(search)
+
+def parse_feed(path: str) -> list:
+    """
+    Parses a saved arXiv API response into results, with the same parser the installed arxiv package uses.
+
+    Args:
+        path (str): The path to an Atom feed returned by the arXiv API.
+
+    Returns:
+        list: The arxiv.Result objects in the feed.
+    """
+    with open(path, "rb") as f:
+        content = f.read()
+    if hasattr(arxiv, "_feed"):
+        # arxiv >= 4 parses feeds itself (with lxml)
+        return arxiv._feed.parse(content).results
+    # Older versions parse with feedparser and build results per entry
+    import feedparser
+    return [arxiv.Result._from_feed_entry(entry) for entry in feedparser.parse(content).entries]
+
+class RecordedArxivSource:
+    """Replays recorded arXiv Atom feeds so ingestion can run offline."""
+
+    def __init__(self, feed_paths: list, page_delay_seconds: float = 0.0):
+        """
+        Initializes the RecordedArxivSource.
+
+        Args:
+            feed_paths (list): Paths to saved arXiv API responses, one file per page, in page order.
+            page_delay_seconds (float): A simulated network delay before each page is returned.
+        """
+        self.feed_paths = list(feed_paths)
+        self.page_delay_seconds = page_delay_seconds
+
+    def results(self, search_query: str, max_results: int):
+        """
+        Yields the recorded results, ignoring the query itself.
+
+        Args:
+            search_query (str): The arXiv query string (unused; the recording defines the results).
+            max_results (int): The maximum number of results to yield.
+
+        Yields:
+            arxiv.Result: The recorded results, in feed order.
+        """
+        yielded = 0
+        for path in self.feed_paths:
+            if yielded >= max_results:
+                return
+            if self.page_delay_seconds:
+                time.sleep(self.page_delay_seconds)
+            for result in parse_feed(path):
+                if yielded >= max_results:
+                    return
+                yield result
+                yielded += 1
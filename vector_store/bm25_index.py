@@ -0,0 +1,166 @@
+import math
+import re
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from tools.sqlite_store import SQLiteStore
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Skipped in queries: they match most abstracts, so they cost a scan of huge posting lists for almost no signal
+STOP_WORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could did do does doing
+for from had has have having he her here hers him his how i if in into is it its itself just me more most
+my no nor not of off on once only or other our ours out over own same she should so some such than that
+the their theirs them then there these they this those through to too under until up very was we were
+what when where which while who whom why will with would you your yours
+""".split())
+
+def tokenize(text: str) -> list:
+    """Lowercases text and splits it into alphanumeric tokens (so 'LoRA-based' -> ['lora', 'based'])."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+class BM25Index(SQLiteStore):
+    """An incrementally maintained, SQLite-backed BM25 inverted index."""
+
+    def __init__(self, db_path: str = "./bm25_index.db", k1: float = 1.5, b: float = 0.75, busy_timeout: float = 30.0):
+        """
+        Initializes the BM25Index.
+
+        Several indexes (e.g. one per worker) may share the same file: writes are
+        atomic and idempotent, and corpus statistics are read from the database.
+
+        Args:
+            db_path (str): The path to the SQLite database file.
+            k1 (float): The BM25 term-frequency saturation parameter.
+            b (float): The BM25 document-length normalization parameter.
+            busy_timeout (float): Seconds to wait for another connection's write to finish.
+        """
+        self.k1 = k1
+        self.b = b
+
+        # Transactions are managed explicitly (isolation_level=None)
+        super().__init__(db_path, timeout=busy_timeout, isolation_level=None)
+        # Lets queries run while another process is writing
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._transaction():
+            self._conn.execute("CREATE TABLE IF NOT EXISTS documents (id TEXT PRIMARY KEY, length INTEGER NOT NULL)")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS postings (
+                    term TEXT NOT NULL,
+                    doc_id TEXT NOT NULL,
+                    tf INTEGER NOT NULL,
+                    PRIMARY KEY (term, doc_id)
+                ) WITHOUT ROWID
+                """
+            )
+            # Document frequencies and corpus totals, maintained by add_documents
+            self._conn.execute("CREATE TABLE IF NOT EXISTS terms (term TEXT PRIMARY KEY, df INTEGER NOT NULL) WITHOUT ROWID")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS corpus (id INTEGER PRIMARY KEY CHECK (id = 0), "
+                "num_docs INTEGER NOT NULL, total_length INTEGER NOT NULL)"
+            )
+            if self._conn.execute("SELECT 1 FROM corpus").fetchone() is None:
+                # New file, or one written before the statistics tables existed
+                self._conn.execute("INSERT INTO corpus SELECT 0, COUNT(*), COALESCE(SUM(length), 0) FROM documents")
+                self._conn.execute("INSERT OR REPLACE INTO terms SELECT term, COUNT(*) FROM postings GROUP BY term")
+        self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS candidates (id TEXT PRIMARY KEY) WITHOUT ROWID")
+
+    @contextmanager
+    def _transaction(self):
+        """Runs a write transaction, taking the database write lock up front so it cannot fail half-way."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _corpus_stats(self) -> tuple:
+        """Returns the document count and average document length."""
+        num_docs, total_length = self._conn.execute("SELECT num_docs, total_length FROM corpus").fetchone()
+        return num_docs, (total_length / num_docs if num_docs else 0.0)
+
+    def __len__(self):
+        with self._lock:
+            return self._corpus_stats()[0]
+
+    def add_documents(self, ids: list, texts: list) -> int:
+        """
+        Indexes documents that are not in the index yet.
+
+        Args:
+            ids (list): The document IDs.
+            texts (list): The text to index for each ID (e.g. title and abstract).
+
+        Returns:
+            int: The number of documents newly indexed.
+        """
+        with self._lock, self._transaction():
+            num_added, total_length = 0, 0
+            postings, term_counts = [], Counter()
+            for doc_id, text in zip(ids, texts):
+                tokens = tokenize(text)
+                cursor = self._conn.execute("INSERT OR IGNORE INTO documents (id, length) VALUES (?, ?)", (doc_id, len(tokens)))
+                if not cursor.rowcount:
+                    # Already indexed, by this or another index on the same file
+                    continue
+                num_added += 1
+                total_length += len(tokens)
+                tfs = Counter(tokens)
+                postings.extend((term, doc_id, tf) for term, tf in tfs.items())
+                term_counts.update(tfs.keys())
+
+            if num_added:
+                self._conn.executemany("INSERT OR IGNORE INTO postings (term, doc_id, tf) VALUES (?, ?, ?)", postings)
+                self._conn.executemany(
+                    "INSERT INTO terms (term, df) VALUES (?, ?) ON CONFLICT (term) DO UPDATE SET df = df + excluded.df",
+                    term_counts.items()
+                )
+                self._conn.execute(
+                    "UPDATE corpus SET num_docs = num_docs + ?, total_length = total_length + ?",
+                    (num_added, total_length)
+                )
+            return num_added
+
+    def search(self, query: str, top_n: int = 10, candidate_ids: list = None) -> list:
+        """
+        Scores documents against a query with BM25.
+
+        Args:
+            query (str): The query text.
+            top_n (int): The number of results to return.
+            candidate_ids (list): Optional IDs to restrict the results to; only their postings are read.
+
+        Returns:
+            list: (doc_id, score) tuples, best match first.
+        """
+        terms = sorted(set(tokenize(query)) - STOP_WORDS)
+        scores = defaultdict(float)
+
+        with self._lock:
+            num_docs, avg_length = self._corpus_stats()
+            if not num_docs or not terms or candidate_ids == []:
+                return []
+
+            placeholders = ",".join("?" * len(terms))
+            dfs = dict(self._conn.execute(f"SELECT term, df FROM terms WHERE term IN ({placeholders})", terms))
+
+            if candidate_ids is not None:
+                self._conn.execute("DELETE FROM candidates")
+                self._conn.executemany("INSERT OR IGNORE INTO candidates (id) VALUES (?)", ((doc_id,) for doc_id in candidate_ids))
+                # One primary-key lookup per candidate instead of the term's whole posting list
+                sql = ("SELECT p.doc_id, p.tf, d.length FROM candidates c "
+                       "JOIN postings p ON p.term = ? AND p.doc_id = c.id JOIN documents d ON d.id = c.id")
+            else:
+                sql = "SELECT p.doc_id, p.tf, d.length FROM postings p JOIN documents d ON d.id = p.doc_id WHERE p.term = ?"
+
+            for term, df in dfs.items():
+                idf = math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf, length in self._conn.execute(sql, (term,)):
+                    norm = self.k1 * (1 - self.b + self.b * length / avg_length)
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_n]
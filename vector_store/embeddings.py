@@ -0,0 +1,86 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from chromadb import EmbeddingFunction
+
+class CachedSentenceTransformerEmbedding(EmbeddingFunction):
+    """A ChromaDB embedding function backed by a single, already-loaded SentenceTransformer."""
+
+    def __init__(self, model, batch_size: int = 64, query_cache_size: int = 1024):
+        """
+        Initializes the embedding function.
+
+        Args:
+            model (SentenceTransformer): The loaded model used for every encode.
+            batch_size (int): The number of texts encoded per forward pass.
+            query_cache_size (int): The number of query embeddings kept in the LRU cache.
+        """
+        self.model = model
+        self.batch_size = batch_size
+        self.query_cache_size = query_cache_size
+        self._query_cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, input):
+        """
+        Embeds a list of documents.
+
+        Args:
+            input (list): The texts to embed.
+
+        Returns:
+            list: One normalized float32 NumPy vector per text.
+        """
+        return list(self.encode(list(input)))
+
+    def encode(self, texts: list) -> np.ndarray:
+        """
+        Encodes texts in batches into normalized embeddings.
+
+        Args:
+            texts (list): The texts to embed.
+
+        Returns:
+            np.ndarray: A (len(texts), dim) float32 array of unit-length vectors.
+        """
+        embeddings = self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return embeddings.astype(np.float32, copy=False)
+
+    def embed_query(self, query: str = None, input=None):
+        """
+        Embeds a single query, reusing the cached vector for repeated queries.
+
+        Chroma also calls this as `embed_query(input=[...])` when a collection is queried by
+        text; that form embeds each text and returns a list of vectors.
+
+        Args:
+            query (str): The query text.
+            input (list): Query texts, as passed by Chroma.
+
+        Returns:
+            np.ndarray: The normalized query embedding (a list of them for `input`).
+        """
+        if input is not None:
+            return [self.embed_query(text) for text in input]
+
+        with self._lock:
+            cached = self._query_cache.get(query)
+            if cached is not None:
+                self._query_cache.move_to_end(query)
+                return cached
+
+        embedding = self.encode([query])[0]
+
+        with self._lock:
+            self._query_cache[query] = embedding
+            self._query_cache.move_to_end(query)
+            while len(self._query_cache) > self.query_cache_size:
+                self._query_cache.popitem(last=False)
+        return embedding
@@ -0,0 +1,86 @@
+import json
+import time
+
+import numpy as np
+
+from tools.sqlite_store import SQLiteStore
+
+class QueryLog(SQLiteStore):
+    """A persisted log of the queries whose results were ingested from arXiv, and when."""
+
+    def __init__(self, db_path: str = "./query_log.db"):
+        """
+        Initializes the QueryLog.
+
+        Args:
+            db_path (str): The path to the SQLite database file.
+        """
+        super().__init__(db_path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS query_log (
+                query TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                embedding BLOB NOT NULL,
+                ingested_at REAL NOT NULL,
+                candidate_ids TEXT,
+                PRIMARY KEY (query, year)
+            )
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(query_log)")}
+        if "candidate_ids" not in columns:
+            # Logs written before candidate sets were recorded
+            self._conn.execute("ALTER TABLE query_log ADD COLUMN candidate_ids TEXT")
+        self._conn.commit()
+
+    def record(self, query: str, year: int, embedding: np.ndarray, ingested_at: float = None, candidate_ids: list = None):
+        """
+        Records that results for a query were just ingested.
+
+        Args:
+            query (str): The research topic.
+            year (int): The year filter used, or None.
+            embedding (np.ndarray): The normalized query embedding.
+            ingested_at (float): The ingestion time as a Unix timestamp; defaults to now.
+            candidate_ids (list): The IDs of every paper found for the query, new or already stored.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO query_log (query, year, embedding, ingested_at, candidate_ids) VALUES (?, ?, ?, ?, ?)",
+                (query, year or 0, np.asarray(embedding, dtype=np.float32).tobytes(), ingested_at or time.time(),
+                 json.dumps(list(candidate_ids or [])))
+            )
+            self._conn.commit()
+
+    def find_similar(self, embedding: np.ndarray, year: int = None, min_similarity: float = 0.85):
+        """
+        Finds the most recently ingested query similar to the given one.
+
+        Args:
+            embedding (np.ndarray): The normalized query embedding.
+            year (int): The year filter; only entries with the same filter match.
+            min_similarity (float): The minimum cosine similarity for two queries to count as similar.
+
+        Returns:
+            dict: The matching entry ('query', 'similarity', 'ingested_at', 'candidate_ids'), or None.
+                'candidate_ids' is None for entries logged before candidate sets were recorded.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT query, embedding, ingested_at, candidate_ids FROM query_log WHERE year = ?", (year or 0,)
+            ).fetchall()
+
+        best = None
+        for query, blob, ingested_at, candidate_ids in rows:
+            similarity = float(np.frombuffer(blob, dtype=np.float32) @ embedding)
+            if similarity < min_similarity:
+                continue
+            if best is None or ingested_at > best['ingested_at']:
+                best = {
+                    'query': query,
+                    'similarity': similarity,
+                    'ingested_at': ingested_at,
+                    'candidate_ids': json.loads(candidate_ids) if candidate_ids is not None else None
+                }
+        return best
@@ -1,30 +1,86 @@
-import arxiv
+import contextvars
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
 import chromadb
+import numpy as np
 from sentence_transformers import SentenceTransformer
+from tools.metrics import metrics
+from vector_store.arxiv_source import ArxivSource
+from vector_store.bm25_index import BM25Index
+from vector_store.embeddings import CachedSentenceTransformerEmbedding
+from vector_store.query_log import QueryLog
+
+# Delta fetches re-request papers submitted this long before the previous ingestion: arXiv only lists
+# a submission once it is announced, often days later, so recent submissions can be missing from a fetch
+DELTA_OVERLAP_SECONDS = 3 * 24 * 3600
 
 class VectorManager:
     """Manages vector storage, retrieval, and ranking of research papers."""
 
-    def __init__(self, db_path="./chroma_db"):
+    def __init__(self, db_path="./chroma_db", embedding_batch_size: int = 64, query_cache_size: int = 1024, write_batch_size: int = 500, source=None, rrf_k: int = 60,
+                 embedding_function=None, client=None, lexical_index=None, query_log=None):
         """
         Initializes the VectorManager.
 
         Args:
             db_path (str): The path to the ChromaDB database directory.
+            embedding_batch_size (int): The number of documents encoded per forward pass.
+            query_cache_size (int): The number of query embeddings kept in memory.
+            write_batch_size (int): The maximum number of papers written to Chroma per upsert.
+            source: Where search results come from; defaults to the live arXiv API (see arxiv_source).
+            rrf_k (int): The reciprocal rank fusion constant used by hybrid ranking.
+            embedding_function (CachedSentenceTransformerEmbedding): Optional shared embedding function,
+                so several managers can use one loaded model (see resources).
+            client: Optional shared ChromaDB client for `db_path`.
+            lexical_index (BM25Index): Optional shared BM25 index for `db_path`. Its owner keeps it in
+                step with the collection (see sync_lexical_index); a private index is synced here.
+            query_log (QueryLog): Optional shared query log for `db_path`.
         """
-        # Use a pre-trained model for creating embeddings. 'all-MiniLM-L6-v2' is a great, lightweight choice.
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.rrf_k = rrf_k
+        self.source = source if source is not None else ArxivSource()
+        self.write_batch_size = write_batch_size
+        # Per-stage durations (in seconds) of the most recent ingestion
+        self.last_ingest_timings = {}
+        # IDs of every paper returned by the most recent search, new or already stored
+        self.last_candidate_ids = []
+        # How the most recent retrieve_papers call was answered
+        self.last_retrieval = {}
+
+        if embedding_function is None:
+            # Use a pre-trained model for creating embeddings. 'all-MiniLM-L6-v2' is a great, lightweight choice.
+            # Route all of Chroma's embedding work through this model instead of its own default
+            embedding_function = CachedSentenceTransformerEmbedding(
+                SentenceTransformer('all-MiniLM-L6-v2'),
+                batch_size=embedding_batch_size,
+                query_cache_size=query_cache_size
+            )
+        self.embedding_function = embedding_function
+        self.embedding_model = embedding_function.model
         
         # Set up the persistent ChromaDB client
-        self.client = chromadb.PersistentClient(path=db_path)
+        self.client = client if client is not None else chromadb.PersistentClient(path=db_path)
         
         # Get or create the collection. A collection in ChromaDB is like a table in a SQL DB.
         self.collection = self.client.get_or_create_collection(
             name="research_papers",
+            embedding_function=self.embedding_function,
             metadata={"hnsw:space": "cosine"} # Use cosine distance for similarity search
         )
 
-    def search_and_process_papers(self, query: str, max_results: int = 20, year: int = None):
+        # Keyword (BM25) index over titles and abstracts, kept in step with the collection
+        self.lexical_index = lexical_index if lexical_index is not None else BM25Index(os.path.join(db_path, "bm25_index.db"))
+        if lexical_index is None:
+            self.sync_lexical_index()
+
+        # Remembers which topics were fetched from arXiv and when, for local-first retrieval
+        self.query_log = query_log if query_log is not None else QueryLog(os.path.join(db_path, "query_log.db"))
+
+    def search_and_process_papers(self, query: str, max_results: int = 20, year: int = None, since: float = None):
         """
         Searches arXiv, processes, and stores papers in the vector database.
 
@@ -32,29 +88,148 @@ class VectorManager:
             query (str): The research topic to search for.
             max_results (int): The maximum number of papers to retrieve.
             year (int): Optional filter for the publication year.
+            since (float): Optional Unix timestamp; only papers submitted after it are fetched.
+
+        Returns:
+            int: The number of new papers added to the database.
+        """
+        timings = {'fetch': 0.0, 'dedup': 0.0, 'embed': 0.0, 'write': 0.0}
+
+        with metrics.span("arxiv_fetch", max_results=max_results) as span:
+            results = list(self.source.results(self._build_search_query(query, year, since), max_results))
+            span.set(results=len(results))
+        timings['fetch'] = span.duration
+
+        self.last_candidate_ids = []
+        num_added = self._store_results(results, query, timings)
+        self._report_ingestion(num_added, timings)
+        return num_added
+
+    def stream_and_process_papers(self, query: str, max_results: int = 200, year: int = None, since: float = None,
+                                  batch_size: int = 32, max_pending: int = 256):
+        """
+        Searches arXiv and stores papers while later result pages are still being fetched.
+
+        A background thread pages through the arXiv results into a bounded queue, while
+        the calling thread embeds and writes them in micro-batches. When the queue is
+        full the fetcher blocks, so memory stays bounded for very large ingests.
+
+        Args:
+            query (str): The research topic to search for.
+            max_results (int): The maximum number of papers to retrieve.
+            year (int): Optional filter for the publication year.
+            since (float): Optional Unix timestamp; only papers submitted after it are fetched.
+            batch_size (int): The number of papers embedded and written together.
+            max_pending (int): The maximum number of fetched results waiting to be processed.
 
         Returns:
             int: The number of new papers added to the database.
         """
-        # Construct the search query for arXiv
+        timings = {'fetch_wait': 0.0, 'dedup': 0.0, 'embed': 0.0, 'write': 0.0}
+        pending = queue.Queue(maxsize=max(1, max_pending))
+        done = object()
+        # Set when the consumer stops early (e.g. a failed write), so the producer never blocks on a full queue
+        stop = threading.Event()
+        search_query = self._build_search_query(query, year, since)
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    pending.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                with metrics.span("arxiv_fetch", max_results=max_results, streaming=True):
+                    for result in self.source.results(search_query, max_results):
+                        if not put(result):
+                            return
+            except Exception as e:
+                put(e)
+            finally:
+                put(done)
+
+        self.last_candidate_ids = []
+        start_total = time.perf_counter()
+        # The producer runs in a copy of this context so its span is attributed to the caller's run
+        producer = threading.Thread(target=contextvars.copy_context().run, args=(produce,), name="arxiv-fetch", daemon=True)
+        producer.start()
+
+        num_added = 0
+        batch = []
+        error = None
+        try:
+            while True:
+                start = time.perf_counter()
+                item = pending.get()
+                timings['fetch_wait'] += time.perf_counter() - start
+
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    # Keep what was already fetched; the producer posts `done` right after the error
+                    error = item
+                    continue
+
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    num_added += self._store_results(batch, query, timings)
+                    batch = []
+
+            if batch:
+                num_added += self._store_results(batch, query, timings)
+        finally:
+            stop.set()
+            producer.join()
+        timings['total'] = time.perf_counter() - start_total
+
+        if error is not None:
+            print(f"An error occurred while fetching from arXiv: {error}")
+        self._report_ingestion(num_added, timings)
+        return num_added
+
+    def _build_search_query(self, query: str, year: int = None, since: float = None) -> str:
+        """Constructs the arXiv search query, optionally restricted to one year and/or to recent submissions."""
         search_query = f'({query})'
         if year:
             # Format the date range for the specified year
             search_query += f' AND submittedDate: [{year}0101 TO {year}1231]'
+        if since:
+            start = datetime.fromtimestamp(since, tz=timezone.utc).strftime('%Y%m%d%H%M')
+            end = datetime.now(tz=timezone.utc).strftime('%Y%m%d%H%M')
+            search_query += f' AND submittedDate: [{start} TO {end}]'
+        return search_query
 
-        # Use the arxiv library to perform the search
-        search = arxiv.Search(
-            query=search_query,
-            max_results=max_results,
-            sort_by=arxiv.SortCriterion.Relevance
-        )
+    def _store_results(self, results: list, query: str, timings: dict) -> int:
+        """
+        Deduplicates, embeds and writes a batch of arXiv results.
+
+        Args:
+            results (list): The arxiv.Result objects to store.
+            query (str): The research topic the results were found for.
+            timings (dict): Stage durations, accumulated in place.
 
+        Returns:
+            int: The number of new papers written.
+        """
+        # CRITICAL: Check which papers are already in our database to avoid duplicates.
+        # A single batched lookup replaces one round-trip per result.
+        with metrics.span("dedup", results=len(results)) as span:
+            candidates = {}
+            for result in results:
+                if result.entry_id not in candidates:
+                    candidates[result.entry_id] = result
+                    self.last_candidate_ids.append(result.entry_id)
+            existing_ids = set(self.collection.get(ids=list(candidates), include=[])['ids']) if candidates else set()
+        timings['dedup'] += span.duration
+
+        ingested_at = int(time.time())
         papers_to_add = []
-        for result in search.results():
-            paper_id = result.entry_id
-            
-            # CRITICAL: Check if the paper is already in our database to avoid duplicates.
-            if self.collection.get(ids=[paper_id])['ids']:
+        for paper_id, result in candidates.items():
+            if paper_id in existing_ids:
                 print(f"Paper '{result.title}' already in DB. Skipping.")
                 continue
 
@@ -63,7 +238,11 @@ class VectorManager:
                 'authors': ", ".join([author.name for author in result.authors]),
                 'published': result.published.strftime('%Y-%m-%d'),
                 'summary': result.summary.replace("\n", " "), # Clean up newlines
-                'url': result.pdf_url
+                'url': result.pdf_url,
+                # Filterable fields for scoped ranking
+                'year': result.published.year,
+                'source_query': query,
+                'ingested_at': ingested_at
             }
             
             papers_to_add.append({
@@ -73,35 +252,224 @@ class VectorManager:
             })
 
         if not papers_to_add:
-            print("No new papers found to add.")
             return 0
 
-        # Add all new papers to the collection in one batch for efficiency
-        self.collection.add(
-            documents=[p['document'] for p in papers_to_add],
-            metadatas=[p['metadata'] for p in papers_to_add],
-            ids=[p['id'] for p in papers_to_add]
-        )
-        
-        print(f"✅ Added {len(papers_to_add)} new papers to the database.")
+        # Embed every new paper in one pass so the model can batch efficiently
+        with metrics.span("embed", papers=len(papers_to_add)) as span:
+            embeddings = self.embedding_function.encode([p['document'] for p in papers_to_add])
+        timings['embed'] += span.duration
+
+        # Write in chunks to keep individual upserts within Chroma's batch limits
+        with metrics.span("chroma_write", papers=len(papers_to_add)) as span:
+            for offset in range(0, len(papers_to_add), self.write_batch_size):
+                chunk = papers_to_add[offset:offset + self.write_batch_size]
+                self.collection.upsert(
+                    documents=[p['document'] for p in chunk],
+                    metadatas=[p['metadata'] for p in chunk],
+                    embeddings=embeddings[offset:offset + len(chunk)],
+                    ids=[p['id'] for p in chunk]
+                )
+            self.lexical_index.add_documents(
+                [p['id'] for p in papers_to_add],
+                [f"{p['metadata']['title']} {p['document']}" for p in papers_to_add]
+            )
+        timings['write'] += span.duration
         return len(papers_to_add)
 
-    def rank_papers(self, query: str, top_n: int = 5) -> list:
+    def _report_ingestion(self, num_added: int, timings: dict):
+        """Records and prints the outcome of an ingestion run."""
+        self.last_ingest_timings = timings
+        if num_added:
+            print(f"✅ Added {num_added} new papers to the database.")
+        else:
+            print("No new papers found to add.")
+        print("Ingestion timings: " + ", ".join(f"{stage}={seconds:.2f}s" for stage, seconds in timings.items()))
+
+    def retrieve_papers(self, query: str, top_n: int = 5, max_results: int = 20, year: int = None,
+                        min_similarity: float = 0.5, min_local_papers: int = None, query_similarity: float = 0.85,
+                        hybrid: bool = True) -> list:
+        """
+        Returns the top papers for a query, answering from the local corpus whenever possible.
+
+        The collection is checked first: if at least `min_local_papers` stored papers are
+        within `min_similarity` of the query, they are ranked and returned without any
+        network call. Otherwise arXiv is searched; if a similar query was ingested before,
+        only papers submitted since shortly before that ingestion are fetched, and the
+        papers found back then are ranked along with them.
+
+        Args:
+            query (str): The research topic.
+            top_n (int): The number of top papers to return.
+            max_results (int): The maximum number of papers to fetch from arXiv when needed.
+            year (int): Optional filter for the publication year.
+            min_similarity (float): The cosine similarity a stored paper needs to count as relevant.
+            min_local_papers (int): How many relevant stored papers make the corpus sufficient; defaults to `top_n`.
+            query_similarity (float): The cosine similarity for a logged query to count as the same topic.
+            hybrid (bool): Whether the final ranking fuses semantic and BM25 results.
+
+        Returns:
+            list: A list of ranked paper metadata dictionaries.
+        """
+        if min_local_papers is None:
+            min_local_papers = top_n
+        where = {'year': int(year)} if year else None
+        query_embedding = self.embedding_function.embed_query(query)
+
+        # 1. Local coverage check
+        depth = max(top_n * 4, 50)
+        local_ids = self._local_matches(query, depth, where, min_similarity)
+        if len(local_ids) >= min_local_papers:
+            self.last_candidate_ids = local_ids
+            self.last_retrieval = {'source': 'local', 'num_added': 0, 'local_matches': len(local_ids)}
+            print(f"Answered '{query}' from {len(local_ids)} local papers.")
+            return self.rank_papers(query, top_n=top_n, candidate_ids=local_ids, year=year, hybrid=hybrid)
+
+        # 2. Fetch from arXiv, only the delta if this topic was ingested before
+        previous = self.query_log.find_similar(query_embedding, year, min_similarity=query_similarity)
+        # Papers seen again in the overlap window are dropped by deduplication
+        since = previous['ingested_at'] - DELTA_OVERLAP_SECONDS if previous else None
+        fetched_at = time.time()
+        if since and year and datetime.fromtimestamp(since, tz=timezone.utc).year > int(year):
+            # Everything submitted in that year was already available at the last ingestion
+            num_added = 0
+            self.last_candidate_ids = []
+        else:
+            num_added = self.stream_and_process_papers(query, max_results=max_results, year=year, since=since)
+
+        candidate_ids = local_ids + self.last_candidate_ids
+        if previous:
+            # Papers found for the earlier, similar query are still part of this topic's candidate set
+            if previous['candidate_ids'] is not None:
+                candidate_ids += previous['candidate_ids']
+            else:
+                # Logged before candidate sets were recorded; only the papers that search added are known
+                prior_where = {'source_query': previous['query']}
+                if where:
+                    prior_where = {'$and': [prior_where, where]}
+                candidate_ids += self.collection.get(where=prior_where, include=[])['ids']
+        candidate_ids = list(dict.fromkeys(candidate_ids))
+        self.query_log.record(query, year, query_embedding, ingested_at=fetched_at, candidate_ids=candidate_ids)
+        self.last_candidate_ids = candidate_ids
+        self.last_retrieval = {
+            'source': 'arxiv-delta' if since else 'arxiv',
+            'num_added': num_added,
+            'local_matches': len(local_ids)
+        }
+        return self.rank_papers(query, top_n=top_n, candidate_ids=candidate_ids, year=year, hybrid=hybrid)
+
+    def _local_matches(self, query: str, n: int, where: dict, min_similarity: float) -> list:
+        """Returns the IDs of up to `n` stored papers whose cosine similarity to the query is at least `min_similarity`."""
+        count = self.collection.count()
+        if count == 0:
+            return []
+        with metrics.span("chroma_query", mode="coverage", n_results=min(n, count)):
+            results = self.collection.query(
+                query_embeddings=[self.embedding_function.embed_query(query)],
+                n_results=min(n, count),
+                where=where,
+                include=['distances']
+            )
+        if not results.get('ids'):
+            return []
+        # Cosine distance is 1 - cosine similarity
+        return [
+            paper_id for paper_id, distance in zip(results['ids'][0], results['distances'][0])
+            if 1.0 - distance >= min_similarity
+        ]
+
+    def rank_papers(self, query: str, top_n: int = 5, where: dict = None, candidate_ids: list = None, year: int = None, hybrid: bool = False) -> list:
         """
         Ranks papers in the database by semantic similarity to the query.
 
         Args:
             query (str): The user's research query.
             top_n (int): The number of top papers to return.
+            where (dict): Optional Chroma metadata filter, e.g. {'source_query': 'graph neural networks'}.
+            candidate_ids (list): Optional paper IDs to rank, e.g. `last_candidate_ids` from the latest search.
+                When given, only these papers are considered instead of the whole collection.
+            year (int): Optional publication year; shorthand for a filter on the stored `year` metadata.
+            hybrid (bool): Fuse the semantic ranking with BM25 keyword matches using reciprocal rank fusion,
+                so exact acronyms and method names are not missed.
 
         Returns:
             list: A list of ranked paper metadata dictionaries.
         """
-        # Query the collection using the user's query. ChromaDB handles the embedding.
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=min(top_n, self.collection.count()) # Ensure we don't ask for more results than exist
-        )
+        if year:
+            year_filter = {'year': int(year)}
+            where = {'$and': [where, year_filter]} if where else year_filter
+        if candidate_ids is not None:
+            if not candidate_ids:
+                return []
+            candidate_ids = list(dict.fromkeys(candidate_ids))
+
+        if not hybrid:
+            return [meta for _, meta in self._vector_rank(query, top_n, where, candidate_ids)]
+
+        # Rank deeper than top_n in both lists so fusion has overlap to work with
+        depth = max(top_n * 4, 50)
+        vector_ids = [paper_id for paper_id, _ in self._vector_rank(query, depth, where, candidate_ids)]
+        with metrics.span("bm25_query", n_results=depth):
+            lexical_ids = [paper_id for paper_id, _ in self.lexical_index.search(query, depth, candidate_ids)]
+
+        fused = defaultdict(float)
+        for ranking in (vector_ids, lexical_ids):
+            for rank, paper_id in enumerate(ranking):
+                fused[paper_id] += 1.0 / (self.rrf_k + rank + 1)
+        ordered_ids = sorted(fused, key=fused.get, reverse=True)
+        if not ordered_ids:
+            return []
+
+        # Keyword matches still have to pass the metadata filter
+        records = self.collection.get(ids=ordered_ids, where=where, include=['metadatas'])
+        metadata_by_id = dict(zip(records['ids'], records['metadatas']))
+        return [metadata_by_id[paper_id] for paper_id in ordered_ids if paper_id in metadata_by_id][:top_n]
+
+    def _vector_rank(self, query: str, top_n: int, where: dict = None, candidate_ids: list = None) -> list:
+        """
+        Ranks papers by embedding similarity.
+
+        Returns:
+            list: (paper_id, metadata) tuples, most similar first.
+        """
+        # Repeated queries reuse a cached embedding
+        query_embedding = self.embedding_function.embed_query(query)
+
+        if candidate_ids is not None:
+            # The candidate set is small, so score it exactly instead of searching the whole HNSW index
+            with metrics.span("chroma_query", mode="candidates", candidates=len(candidate_ids)):
+                records = self.collection.get(ids=candidate_ids, where=where, include=['embeddings', 'metadatas'])
+            if not records['ids']:
+                return []
+            # Embeddings are normalized, so the dot product is the cosine similarity
+            scores = np.asarray(records['embeddings'], dtype=np.float32) @ query_embedding
+            order = np.argsort(-scores)[:top_n]
+            return [(records['ids'][i], records['metadatas'][i]) for i in order]
+
+        count = self.collection.count()
+        if count == 0:
+            return []
+
+        # Query the collection using the user's query
+        with metrics.span("chroma_query", mode="hnsw", n_results=min(top_n, count)):
+            results = self.collection.query(
+                query_embeddings=[query_embedding],
+                n_results=min(top_n, count), # Ensure we don't ask for more results than exist
+                where=where
+            )
         
-        # The results are nested, so we extract the metadatas from the first query result
-        return results['metadatas'][0] if results.get('metadatas') else []
\ No newline at end of file
+        # The results are nested, so we extract the first query result
+        if not results.get('metadatas'):
+            return []
+        return list(zip(results['ids'][0], results['metadatas'][0]))
+
+    def sync_lexical_index(self):
+        """Indexes any stored papers missing from the BM25 index, e.g. ones added before it existed."""
+        if len(self.lexical_index) >= self.collection.count():
+            return
+        all_ids = self.collection.get(include=[])['ids']
+        for offset in range(0, len(all_ids), self.write_batch_size):
+            records = self.collection.get(ids=all_ids[offset:offset + self.write_batch_size], include=['metadatas'])
+            self.lexical_index.add_documents(
+                records['ids'],
+                [f"{meta.get('title', '')} {meta.get('summary', '')}" for meta in records['metadatas']]
+            )